@@ -1,4 +1,6 @@
+import atexit
 import os
+import queue
 import re
 import sys
 from pathlib import Path
@@ -41,8 +43,14 @@ if missing:
     sys.exit(1)
 
 
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+
+# Idle connections handed back via conn_close(); reused by conn_open()
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+
 def conn_open():
-    """Open a new database connection using environment configuration.
+    """Get a database connection, reusing an idle pooled one if available.
 
     Returns:
         pymysql.Connection: Database connection object
@@ -51,7 +59,17 @@ def conn_open():
         pymysql.Error: If connection fails
     """
     try:
-        return pymysql.connect(**DB)
+        while True:
+            try:
+                conn = _pool.get_nowait()
+            except queue.Empty:
+                return pymysql.connect(**DB)
+            try:
+                conn.ping(reconnect=True)
+                return conn
+            except pymysql.Error:
+                # Stale socket; drop it and try the next one
+                continue
     except pymysql.Error as e:
         print(f"Error: Failed to connect to database: {e}", file=sys.stderr)
         print(
@@ -59,15 +77,52 @@ def conn_open():
         raise
 
 
+def conn_close(conn):
+    """
+    Return a connection to the pool, or close it if the pool is full.
+    Uncommitted work is rolled back so the next borrower starts clean.
+    """
+    if not conn.open:
+        return
+    try:
+        conn.rollback()
+    except pymysql.Error:
+        # Broken connection; don't hand it out again
+        conn.close()
+        return
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def close_all():
+    """Close every idle pooled connection (registered to run at exit)."""
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return
+        if conn.open:
+            conn.close()
+
+
+atexit.register(close_all)
+
+
+_WS_RE = re.compile(r"\s+")
+_QUOTE_TABLE = str.maketrans({"\u2019": "'", "\u2018": "'"})
+_PERSON_TABLE = str.maketrans({"\u2019": "'", "\u2018": "'", ".": None})
+
+
 def norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", s.strip())
+    return _WS_RE.sub(" ", s.strip())
 
 
 def norm_title(t: str | None) -> str:
     if not t:
         return ""
-    t = t.replace("’", "'")
-    return norm_space(t).lower()
+    return _WS_RE.sub(" ", t.translate(_QUOTE_TABLE).strip()).lower()
 
 
 def strip_dir_prefix(name: str | None) -> str | None:
@@ -84,14 +139,18 @@ def remove_parentheses(text: str) -> str:
     - "Unclosed paren (something" -> "Unclosed paren"
     - "Normal title" -> "Normal title"
     """
-    result = text
-    while True:
-        new_result = re.sub(r'\([^()]*\)', '', result)
-        if new_result == result:
-            # Remove any unclosed parenthesis and following text
-            new_result = re.sub(r'\([^)]*$', '', result)
-            return norm_space(new_result)
-        result = new_result
+    # Single left-to-right scan tracking nesting depth; an unclosed "("
+    # drops everything after it, a stray ")" is kept as-is.
+    out = []
+    depth = 0
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")" and depth:
+            depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    return norm_space("".join(out))
 
 
 def normalize_person_name(name: str) -> str:
@@ -114,9 +173,6 @@ def normalize_person_name(name: str) -> str:
     if not name or not name.strip():
         return ""
 
-    # Replace special quotes
-    name = name.replace("'", "'").replace("'", "'")
-
     # Normalize spaces
     name = norm_space(name).strip()
 
@@ -126,9 +182,9 @@ def normalize_person_name(name: str) -> str:
         if len(parts) == 2:
             name = f"{parts[1]} {parts[0]}"
 
-    # Remove periods (mainly from middle initials)
-    # "Kim A. Snyder" → "Kim A Snyder"
-    name = name.replace('.', '')
+    # Replace special quotes and remove periods (mainly from middle
+    # initials) in one pass: "Kim A. Snyder" → "Kim A Snyder"
+    name = name.translate(_PERSON_TABLE)
 
     # Normalize spaces again (in case removing periods created double spaces)
     name = norm_space(name)
@@ -191,15 +247,93 @@ def upsert_person(conn, name, imdb_id=None, tmdb_id=None):
         return cursor.lastrowid
 
 
+def upsert_persons_bulk(conn, persons):
+    """
+    Find or create many person records with batched statements.
+
+    Args:
+        conn: Database connection
+        persons: List of dicts with "name" and optional "imdb_id"/"tmdb_id"
+
+    Returns:
+        dict mapping normalized_name -> person_id
+    """
+    rows = {}
+    for p in persons:
+        name = p.get('name')
+        norm_name = normalize_person_name(name)
+        if not norm_name:
+            continue
+        row = (name, p.get('imdb_id'), p.get('tmdb_id'), norm_name)
+        prev = rows.get(norm_name)
+        # Keep the variant with the most external IDs
+        if prev is None or bool(row[1]) + bool(row[2]) > bool(prev[1]) + bool(prev[2]):
+            rows[norm_name] = row
+
+    if not rows:
+        return {}
+
+    values = list(rows.values())
+    out = {}
+    with conn.cursor() as cursor:
+        # Chunk to stay well under MySQL's 65k placeholder limit
+        for i in range(0, len(values), 1000):
+            chunk = values[i:i + 1000]
+            cursor.executemany(
+                """
+                INSERT INTO person (name, imdb_id, tmdb_id, normalized_name)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    imdb_id = COALESCE(imdb_id, VALUES(imdb_id)),
+                    tmdb_id = COALESCE(tmdb_id, VALUES(tmdb_id))
+                """,
+                chunk
+            )
+            names = [row[3] for row in chunk]
+            placeholders = ','.join(['%s'] * len(names))
+            cursor.execute(
+                f"SELECT id, normalized_name FROM person WHERE normalized_name IN ({placeholders})",
+                names
+            )
+            for person_id, norm_name in cursor.fetchall():
+                out[norm_name] = person_id
+    return out
+
+
 def upsert_film_person(conn, film_id, person_id, role):
     """Link a person to a film with a specific role."""
     with conn.cursor() as cursor:
+        # ON DUPLICATE KEY instead of REPLACE: no delete + re-insert churn
         cursor.execute(
-            "REPLACE INTO film_person (film_id, person_id, role) VALUES (%s, %s, %s)",
+            "INSERT INTO film_person (film_id, person_id, role) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE role = role",
             (film_id, person_id, role)
         )
 
 
+def upsert_film_persons_bulk(conn, triples):
+    """Link many (film_id, person_id, role) triples, 500 rows per batch."""
+    with conn.cursor() as cursor:
+        for i in range(0, len(triples), 500):
+            cursor.executemany(
+                "INSERT INTO film_person (film_id, person_id, role) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE role = VALUES(role)",
+                triples[i:i + 500]
+            )
+
+
+def iter_all_films(conn):
+    """
+    Stream all films with an unbuffered cursor.
+
+    MySQL cannot run other queries on the connection until the stream is
+    exhausted, so use a dedicated connection for the iteration.
+    """
+    with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+        cursor.execute("SELECT id, title, year, imdb_id, tmdb_id FROM film")
+        yield from cursor
+
+
 def fetch_all_films(conn):
     """Fetch all films for enrichment scripts."""
     with conn.cursor(pymysql.cursors.DictCursor) as cursor:
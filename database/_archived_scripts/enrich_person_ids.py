@@ -18,10 +18,11 @@ import os
 import sys
 import time
 import requests
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict
 from dotenv import load_dotenv
-from db_helper import conn_open
+from db_helper import conn_close, conn_open
 
 # Load environment
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -69,10 +70,15 @@ def search_tmdb_person(name: str) -> Optional[Dict]:
         return None
 
 
+@lru_cache(maxsize=None)
 def get_person_imdb_id_from_tmdb(tmdb_person_id: int) -> Optional[str]:
-    """Get IMDB ID from TMDB person's external IDs."""
+    """
+    Get IMDB ID from TMDB person's external IDs.
+    Cached per TMDB id, since name variants of one person share it.
+    """
     params = {"api_key": TMDB_API_KEY}
 
+    time.sleep(0.3)  # Rate limiting (only for uncached lookups)
     try:
         resp = requests.get(
             f"{TMDB_BASE}/person/{tmdb_person_id}/external_ids",
@@ -108,7 +114,6 @@ def enrich_person_ids(name: str) -> Dict[str, Optional[str]]:
         result["tmdb_id"] = str(tmdb_id)
 
         # Get IMDB ID from TMDB
-        time.sleep(0.3)  # Rate limiting
         imdb_id = get_person_imdb_id_from_tmdb(tmdb_id)
         if imdb_id:
             result["imdb_id"] = imdb_id
@@ -169,7 +174,7 @@ def main():
         print(f"  Not found: {not_found}")
 
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
@@ -40,7 +40,7 @@ from aliases import resolve_cinema_alias
 import pymysql
 from dateutil import parser as dtparser
 
-from db_helper import DB, conn_open, norm_space, norm_title, strip_dir_prefix, normalize_person_name
+from db_helper import DB, conn_close, conn_open, norm_space, norm_title, strip_dir_prefix, normalize_person_name
 
 
 # =========================
@@ -53,7 +53,9 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data", "latest")
 
 # Timezone configuration
-LOCAL_TZ = ZoneInfo("America/Vancouver")
+# Stored in stg_screening.tz and hashed into content_hash
+LOCAL_TZ_NAME = "America/Vancouver"
+LOCAL_TZ = ZoneInfo(LOCAL_TZ_NAME)
 UTC = ZoneInfo("UTC")
 
 # Default input files (relative to DATA_DIR)
@@ -101,15 +103,12 @@ def guess_end(start_utc: datetime, runtime_min: int | None) -> datetime:
     return start_utc + timedelta(minutes=minutes)
 
 
+_AMPM_RE = re.compile(r"([ap])\.m\.", re.I)
+
+
 def normalize_ampm(s: str) -> str:
-    """Normalize am/pm variants."""
-    return (
-        s.replace("a.m.", "am")
-        .replace("p.m.", "pm")
-        .replace("A.M.", "am")
-        .replace("P.M.", "pm")
-        .strip()
-    )
+    """Normalize am/pm variants ('p.m.', 'P.M.' -> 'pm')."""
+    return _AMPM_RE.sub(lambda m: m.group(1).lower() + "m", s).strip()
 
 
 def is_missing_token(s: str | None) -> bool:
@@ -122,7 +121,7 @@ def is_missing_token(s: str | None) -> bool:
 
 def stable_uid(cinema_id: int, film_id: int, start_at_utc: datetime) -> str:
     """Stable synthetic UID when upstream has no ID."""
-    key = f"{cinema_id}|{film_id}|{start_at_utc:%Y-%m-%d %H:%M:%S}"
+    key = f"{cinema_id}|{film_id}|{start_at_utc.isoformat(' ', 'seconds')}"
     return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
 
 
@@ -140,8 +139,8 @@ def make_content_hash(
     parts = [
         str(film_id),
         str(cinema_id),
-        start_utc.strftime("%Y-%m-%d %H:%M:%S"),
-        end_utc.strftime("%Y-%m-%d %H:%M:%S"),
+        start_utc.isoformat(" ", "seconds"),
+        end_utc.isoformat(" ", "seconds"),
         "" if runtime_min is None else str(runtime_min),
         tz or "",
         source_url or "",
@@ -157,17 +156,17 @@ SQL = {
     "cinema_ins": """
 INSERT INTO cinema (name, website, address)
 VALUES (%s,%s,%s)
-ON DUPLICATE KEY UPDATE website=VALUES(website), address=VALUES(address)
+ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), website=VALUES(website), address=VALUES(address)
 """,
     "film_ins": """
 INSERT INTO film (title, year, description, imdb_id, tmdb_id, normalized_title)
 VALUES (%s,%s,%s,%s,%s,%s)
-ON DUPLICATE KEY UPDATE description=VALUES(description), normalized_title=VALUES(normalized_title)
+ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), description=VALUES(description), normalized_title=VALUES(normalized_title)
 """,
     "person_ins": """
 INSERT INTO person (name, imdb_id, tmdb_id, normalized_name)
 VALUES (%s,%s,%s,%s)
-ON DUPLICATE KEY UPDATE name=VALUES(name), normalized_name=VALUES(normalized_name)
+ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), name=VALUES(name), normalized_name=VALUES(normalized_name)
 """,
     "film_person_ins": """
 INSERT IGNORE INTO film_person (film_id, person_id, role) VALUES (%s,%s,%s)
@@ -213,9 +212,16 @@ def fetch_one(cur, sql, params):
 
 
 def ensure_cinema(cur, cinema_name, cinema_website=None):
+    # id=LAST_INSERT_ID(id) makes lastrowid the existing id on duplicates too
     upsert(cur, SQL["cinema_ins"], (cinema_name, cinema_website, None))
-    row = fetch_one(cur, "SELECT id FROM cinema WHERE name=%s", (cinema_name,))
-    return row[0]
+    if cur.lastrowid:
+        return cur.lastrowid
+
+    # lastrowid is 0 when the duplicate row was left unchanged (same
+    # website/address): no affected row, so re-select by name
+    row = fetch_one(cur, "SELECT id FROM cinema WHERE name = %s", (cinema_name,))
+    if row:
+        return row[0]
 
 
 def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None):
@@ -253,7 +259,11 @@ def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None):
     upsert(cur, SQL["film_ins"], (title, year,
            description, imdb, tmdb, normalized))
 
-    # Retrieve the newly inserted film
+    # New or existing id (see id=LAST_INSERT_ID(id) in film_ins); 0 only
+    # if the driver saw no affected row, so re-select in that case
+    if cur.lastrowid:
+        return cur.lastrowid
+
     row = fetch_one(
         cur,
         "SELECT id FROM film WHERE normalized_title=LOWER(%s) AND (year <=> %s)",
@@ -295,7 +305,11 @@ def ensure_person(cur, name, imdb=None, tmdb=None):
     # Insert new person
     upsert(cur, SQL["person_ins"], (name, imdb, tmdb, normalized))
 
-    # Retrieve the newly inserted person
+    # New or existing id (see id=LAST_INSERT_ID(id) in person_ins); 0 only
+    # if the driver saw no affected row, so re-select in that case
+    if cur.lastrowid:
+        return cur.lastrowid
+
     row = fetch_one(
         cur, "SELECT id FROM person WHERE normalized_name = %s", (normalized,))
     if row:
@@ -305,14 +319,18 @@ def ensure_person(cur, name, imdb=None, tmdb=None):
         f"Could not insert or find person: {name} (normalized: {normalized})")
 
 
+# ',', '&', '/' (and ' and ', replaced first) all become one separator
+_DIR_SEP_TABLE = str.maketrans({",": "|", "&": "|", "/": "|"})
+
+
 def link_directors(cur, film_id, director_field):
     """Best-effort to insert director persons and link."""
     if not director_field:
         return
     cleaned = strip_dir_prefix(director_field)
     # split on ',', '&', '/', ' and '
-    names = re.split(r",|&|/| and ", cleaned)
-    for n in [norm_space(x) for x in names if norm_space(x)]:
+    names = cleaned.replace(" and ", "|").translate(_DIR_SEP_TABLE).split("|")
+    for n in [x for x in map(norm_space, names) if x]:
         pid = ensure_person(cur, n)
         upsert(cur, SQL["film_person_ins"], (film_id, pid, "director"))
 
@@ -378,12 +396,12 @@ def load_source(
     cinema_website; otherwise website=None.
     """
     with open(path, "r", encoding="utf-8") as f:
-        rows = json.load(f)
+        text = f.read()
+    rows = json.loads(text)
 
-    # Audit record (one per source run)
+    # Audit record (one per source run); the file text is stored as-is
     default_cid = ensure_cinema(cur, cinema_name, cinema_website)
-    upsert(cur, SQL["raw_import_ins"], (default_cid,
-           source_name, json.dumps(rows, ensure_ascii=False)))
+    upsert(cur, SQL["raw_import_ins"], (default_cid, source_name, text))
 
     loaded_at_utc = datetime.now(UTC).replace(tzinfo=None)
 
@@ -393,6 +411,9 @@ def load_source(
     def eq_ci(a: str | None, b: str | None) -> bool:
         return (a or "").strip().lower() == (b or "").strip().lower()
 
+    # staging rows are written in one executemany after the loop
+    stg_rows = []
+
     for r in rows:
         title = r.get("title")
         year = parse_year(r.get("year"))
@@ -446,22 +467,20 @@ def load_source(
                 start_utc,
                 end_utc,
                 runtime,
-                "America/Vancouver",
+                LOCAL_TZ_NAME,
                 r.get("detail_url"),
                 None,
             )
 
-            # --- Insert into staging ---
-            upsert(
-                cur,
-                SQL["stg_screening_ins"],
+            # --- Queue for staging ---
+            stg_rows.append(
                 (
                     film_id,
                     cid,
                     start_utc,
                     end_utc,
                     runtime,
-                    "America/Vancouver",
+                    LOCAL_TZ_NAME,
                     source_name,
                     source_uid,
                     r.get("detail_url"),
@@ -470,9 +489,13 @@ def load_source(
                     st.get("time"),
                     content_hash,
                     loaded_at_utc,
-                ),
+                )
             )
 
+    # pymysql rewrites this into multi-row INSERTs (split at max_stmt_length),
+    # so the server parses one statement per chunk instead of one per row
+    cur.executemany(SQL["stg_screening_ins"], stg_rows)
+
 
 # =========================
 # Source wrappers
@@ -556,7 +579,7 @@ def main():
                     print(f"[SKIP] Unrecognized file: {fp}")
         print("✅ Staging load complete. Run merge SQL to promote to live screening table.")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
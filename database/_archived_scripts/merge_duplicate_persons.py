@@ -17,74 +17,91 @@ Usage:
     --dry-run: Preview changes without modifying database
 """
 
+import json
 import sys
 from typing import List, Tuple, Dict
-from db_helper import conn_open
+from db_helper import conn_close, conn_open
 
 
-def find_duplicates_by_field(conn, field: str) -> List[Tuple]:
+# Duplicate keys, in the order their groups are merged
+DUPLICATE_FIELDS = ('imdb_id', 'tmdb_id', 'normalized_name')
+
+
+def find_all_duplicates(conn) -> Dict[str, List[Tuple]]:
     """
-    Find persons with duplicate values in a specific field.
+    Find persons with duplicate values in any of DUPLICATE_FIELDS, in one
+    query (UNION ALL of one grouped subquery per field).
 
     Args:
         conn: Database connection
-        field: Field name ('imdb_id', 'tmdb_id', or 'normalized_name')
 
     Returns:
-        List of (field_value, [person_ids]) tuples
+        {field: [(field_value, [person_ids]), ...]} for every field in
+        DUPLICATE_FIELDS, largest groups first
     """
-    with conn.cursor() as cursor:
-        cursor.execute(f"""
-            SELECT {field}, GROUP_CONCAT(id ORDER BY id) as ids, COUNT(*) as cnt
-            FROM person 
+    subqueries = [
+        f"""
+            SELECT '{field}' AS kind, CAST({field} AS CHAR) AS val,
+                   JSON_ARRAYAGG(id) AS ids, COUNT(*) AS cnt
+            FROM person
             WHERE {field} IS NOT NULL AND {field} != ''
             GROUP BY {field}
             HAVING cnt > 1
-            ORDER BY cnt DESC
-        """)
+        """
+        for field in DUPLICATE_FIELDS
+    ]
+    with conn.cursor() as cursor:
+        cursor.execute(" UNION ALL ".join(subqueries) + " ORDER BY cnt DESC")
         results = cursor.fetchall()
 
-    duplicates = []
-    for field_value, ids_str, count in results:
-        ids = [int(x) for x in ids_str.split(',')]
-        duplicates.append((field_value, ids))
+    duplicates = {field: [] for field in DUPLICATE_FIELDS}
+    for kind, field_value, ids_json, count in results:
+        # JSON_ARRAYAGG takes no ORDER BY, so sort here
+        duplicates[kind].append((field_value, sorted(json.loads(ids_json))))
 
     return duplicates
 
 
-def get_person_details(conn, person_id: int) -> Dict:
-    """Get full details of a person record."""
+def get_persons_details(conn, person_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Get details plus film_person reference count ('ref_count') of many
+    persons in two queries. Returns {person_id: details}; missing ids are
+    absent.
+    """
+    placeholders = ','.join(['%s'] * len(person_ids))
     with conn.cursor() as cursor:
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT id, name, imdb_id, tmdb_id, normalized_name, created_at
-            FROM person 
-            WHERE id = %s
-        """, (person_id,))
-        row = cursor.fetchone()
-
-        if not row:
-            return {}
-
-        return {
-            'id': row[0],
-            'name': row[1],
-            'imdb_id': row[2],
-            'tmdb_id': row[3],
-            'normalized_name': row[4],
-            'created_at': row[5],
+            FROM person
+            WHERE id IN ({placeholders})
+        """, person_ids)
+        records = {
+            row[0]: {
+                'id': row[0],
+                'name': row[1],
+                'imdb_id': row[2],
+                'tmdb_id': row[3],
+                'normalized_name': row[4],
+                'created_at': row[5],
+                'ref_count': 0,
+            }
+            for row in cursor.fetchall()
         }
 
+        cursor.execute(f"""
+            SELECT person_id, COUNT(*)
+            FROM film_person
+            WHERE person_id IN ({placeholders})
+            GROUP BY person_id
+        """, person_ids)
+        for person_id, ref_count in cursor.fetchall():
+            if person_id in records:
+                records[person_id]['ref_count'] = ref_count
 
-def count_film_references(conn, person_id: int) -> int:
-    """Count how many film_person records reference this person."""
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT COUNT(*) FROM film_person WHERE person_id = %s
-        """, (person_id,))
-        return cursor.fetchone()[0]
+    return records
 
 
-def choose_best_record(conn, person_ids: List[int]) -> int:
+def choose_best_record(conn, person_ids: List[int], details: Dict[int, Dict] = None) -> int:
     """
     Choose which person record to keep based on:
     1. Has most external IDs (imdb_id and/or tmdb_id)
@@ -92,14 +109,14 @@ def choose_best_record(conn, person_ids: List[int]) -> int:
     3. Earliest created_at
     4. Smallest ID (tiebreaker)
 
+    details: optional get_persons_details() result covering person_ids;
+    fetched when not given.
+
     Returns: person_id to keep
     """
-    records = []
-    for pid in person_ids:
-        details = get_person_details(conn, pid)
-        ref_count = count_film_references(conn, pid)
-        details['ref_count'] = ref_count
-        records.append(details)
+    if details is None:
+        details = get_persons_details(conn, person_ids)
+    records = [details[pid] for pid in person_ids if pid in details]
 
     def score(record):
         # Count external IDs
@@ -120,12 +137,12 @@ def choose_best_record(conn, person_ids: List[int]) -> int:
             -record['id']       # Smaller is better (negated)
         )
 
-    # Sort by score (descending) and pick the best
-    sorted_records = sorted(records, key=score, reverse=True)
-    return sorted_records[0]['id']
+    # Highest score wins; no need to sort the whole group
+    return max(records, key=score)['id']
 
 
-def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = False):
+def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = False,
+                  details: Dict[int, Dict] = None):
     """
     Merge duplicate person records into one.
 
@@ -134,8 +151,14 @@ def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = Fals
         keep_id: ID of the record to keep
         merge_ids: IDs of records to merge into keep_id
         dry_run: If True, only print what would be done
+        details: Optional get_persons_details() result covering the group
+            (e.g. the one choose_best_record used); fetched when not given
     """
-    keep_details = get_person_details(conn, keep_id)
+    # Every record of the group, with ref counts
+    records = details
+    if records is None:
+        records = get_persons_details(conn, [keep_id] + merge_ids)
+    keep_details = records[keep_id]
 
     prefix = "[DRY RUN] " if dry_run else ""
     print(f"\n{prefix}Merging into: {keep_details['name']} (ID: {keep_id})")
@@ -146,69 +169,67 @@ def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = Fals
     total_refs = 0
 
     for merge_id in merge_ids:
-        merge_details = get_person_details(conn, merge_id)
-        ref_count = count_film_references(conn, merge_id)
+        merge_details = records[merge_id]
+        ref_count = merge_details['ref_count']
         total_refs += ref_count
 
         print(
             f"  {prefix}Merging: {merge_details['name']} (ID: {merge_id}) - {ref_count} film references")
 
-        if not dry_run:
-            with conn.cursor() as cursor:
-                # Update film_person references
-                # Use INSERT IGNORE with SELECT to handle duplicate key conflicts
-                cursor.execute("""
-                    INSERT IGNORE INTO film_person (film_id, person_id, role)
-                    SELECT film_id, %s, role 
-                    FROM film_person 
-                    WHERE person_id = %s
-                """, (keep_id, merge_id))
+    if not dry_run and merge_ids:
+        # All merged records at once: three statements per group
+        placeholders = ','.join(['%s'] * len(merge_ids))
+        with conn.cursor() as cursor:
+            # Update film_person references
+            # Use INSERT IGNORE with SELECT to handle duplicate key conflicts
+            cursor.execute(f"""
+                INSERT IGNORE INTO film_person (film_id, person_id, role)
+                SELECT film_id, %s, role
+                FROM film_person
+                WHERE person_id IN ({placeholders})
+            """, (keep_id, *merge_ids))
 
-                # Delete old film_person records
-                cursor.execute("""
-                    DELETE FROM film_person WHERE person_id = %s
-                """, (merge_id,))
+            # Delete old film_person records
+            cursor.execute(f"""
+                DELETE FROM film_person WHERE person_id IN ({placeholders})
+            """, merge_ids)
 
-                # Delete the merged person record
-                cursor.execute("DELETE FROM person WHERE id = %s", (merge_id,))
+            # Delete the merged person records
+            cursor.execute(
+                f"DELETE FROM person WHERE id IN ({placeholders})", merge_ids)
 
     print(f"  {prefix}Total references to merge: {total_refs}")
 
-    # Update keep record with best available data from all records
-    if not dry_run:
-        all_ids = [keep_id] + merge_ids
-        with conn.cursor() as cursor:
-            # Find best values across all duplicate records
-            placeholders = ','.join(['%s'] * len(all_ids))
-            cursor.execute(f"""
-                SELECT 
-                    MAX(CASE WHEN imdb_id IS NOT NULL AND imdb_id != '' THEN imdb_id END) as best_imdb,
-                    MAX(CASE WHEN tmdb_id IS NOT NULL THEN tmdb_id END) as best_tmdb
-                FROM person 
-                WHERE id IN ({placeholders})
-            """, all_ids)
-
-            result = cursor.fetchone()
-            best_imdb = result[0] if result else None
-            best_tmdb = result[1] if result else None
-
-            # Update keep record if we found better values
-            updates = []
-            if best_imdb and not keep_details.get('imdb_id'):
-                cursor.execute(
-                    "UPDATE person SET imdb_id = %s WHERE id = %s", (best_imdb, keep_id))
-                print(f"  Updated IMDB ID: {best_imdb}")
-                updates.append(f"IMDB: {best_imdb}")
-
-            if best_tmdb and not keep_details.get('tmdb_id'):
-                cursor.execute(
-                    "UPDATE person SET tmdb_id = %s WHERE id = %s", (best_tmdb, keep_id))
-                print(f"  Updated TMDB ID: {best_tmdb}")
-                updates.append(f"TMDB: {best_tmdb}")
-
-            if updates:
-                print(f"  Enhanced kept record with: {', '.join(updates)}")
-
+    # Update keep record with best available data from all records,
+    # unless it already has both external IDs
+    if not dry_run and not (keep_details.get('imdb_id') and keep_details.get('tmdb_id')):
+        # Find best values across all duplicate records, from the rows
+        # loaded above (the merged records are already deleted by now)
+        best_imdb = max(
+            (r['imdb_id'] for r in records.values() if r['imdb_id']), default=None)
+        best_tmdb = max(
+            (r['tmdb_id'] for r in records.values() if r['tmdb_id'] is not None),
+            default=None)
+
+        # Update keep record if we found better values, in one UPDATE;
+        # COALESCE keeps any value the record already has
+        updates = []
+        if best_imdb and not keep_details.get('imdb_id'):
+            print(f"  Updated IMDB ID: {best_imdb}")
+            updates.append(f"IMDB: {best_imdb}")
+        if best_tmdb and not keep_details.get('tmdb_id'):
+            print(f"  Updated TMDB ID: {best_tmdb}")
+            updates.append(f"TMDB: {best_tmdb}")
+
+        if updates:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE person
+                    SET imdb_id = COALESCE(NULLIF(imdb_id, ''), %s),
+                        tmdb_id = COALESCE(tmdb_id, %s)
+                    WHERE id = %s
+                """, (best_imdb, best_tmdb, keep_id))
+            print(f"  Enhanced kept record with: {', '.join(updates)}")
 
 def main():
     dry_run = '--dry-run' in sys.argv
@@ -224,44 +245,36 @@ def main():
     try:
         total_merged = 0
 
-        # 1. Find and merge duplicates by IMDB ID
-        print("=" * 60)
-        print("Step 1: Finding duplicates by IMDB ID...")
-        print("=" * 60)
-        imdb_dupes = find_duplicates_by_field(conn, 'imdb_id')
-        print(f"Found {len(imdb_dupes)} groups of IMDB duplicates")
-
-        for imdb_id, person_ids in imdb_dupes:
-            keep_id = choose_best_record(conn, person_ids)
-            merge_ids = [pid for pid in person_ids if pid != keep_id]
-            merge_persons(conn, keep_id, merge_ids, dry_run)
-            total_merged += len(merge_ids)
-
-        # 2. Find and merge duplicates by TMDB ID
-        print("\n" + "=" * 60)
-        print("Step 2: Finding duplicates by TMDB ID...")
-        print("=" * 60)
-        tmdb_dupes = find_duplicates_by_field(conn, 'tmdb_id')
-        print(f"Found {len(tmdb_dupes)} groups of TMDB duplicates")
-
-        for tmdb_id, person_ids in tmdb_dupes:
-            keep_id = choose_best_record(conn, person_ids)
-            merge_ids = [pid for pid in person_ids if pid != keep_id]
-            merge_persons(conn, keep_id, merge_ids, dry_run)
-            total_merged += len(merge_ids)
-
-        # 3. Find and merge duplicates by normalized_name
-        print("\n" + "=" * 60)
-        print("Step 3: Finding duplicates by normalized_name...")
-        print("=" * 60)
-        name_dupes = find_duplicates_by_field(conn, 'normalized_name')
-        print(f"Found {len(name_dupes)} groups of name duplicates")
-
-        for norm_name, person_ids in name_dupes:
-            keep_id = choose_best_record(conn, person_ids)
-            merge_ids = [pid for pid in person_ids if pid != keep_id]
-            merge_persons(conn, keep_id, merge_ids, dry_run)
-            total_merged += len(merge_ids)
+        # All three kinds of duplicates in one query, before any merge.
+        # Persons merged away in an earlier step are replaced by the
+        # record they were merged into, so later groups stay complete.
+        all_dupes = find_all_duplicates(conn)
+        merged_into = {}
+
+        for step, (field, groups) in enumerate(all_dupes.items(), start=1):
+            print("\n" + "=" * 60)
+            print(f"Step {step}: Duplicates by {field}...")
+            print("=" * 60)
+            print(f"Found {len(groups)} groups of {field} duplicates")
+
+            for field_value, person_ids in groups:
+                person_ids = list(dict.fromkeys(
+                    merged_into.get(pid, pid) for pid in person_ids))
+                if len(person_ids) < 2:
+                    continue
+
+                # One details fetch per group, shared by scoring and merge
+                details = get_persons_details(conn, person_ids)
+                keep_id = choose_best_record(conn, person_ids, details)
+                merge_ids = [pid for pid in person_ids if pid != keep_id]
+                merge_persons(conn, keep_id, merge_ids, dry_run, details)
+                total_merged += len(merge_ids)
+
+                for pid, into in merged_into.items():
+                    if into in merge_ids:
+                        merged_into[pid] = keep_id
+                for pid in merge_ids:
+                    merged_into[pid] = keep_id
 
         # Commit or rollback
         if not dry_run:
@@ -283,7 +296,7 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
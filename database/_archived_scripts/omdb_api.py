@@ -5,7 +5,7 @@ import re
 from pathlib import Path
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
-from db_helper import DB, conn_open, norm_space, norm_title, strip_dir_prefix, fetch_all_films, upsert_person, upsert_film_person
+from db_helper import DB, conn_close, conn_open, norm_space, norm_title, strip_dir_prefix, fetch_all_films, upsert_person, upsert_film_persons_bulk
 
 # Load environment variables from .env in database directory
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -143,19 +143,21 @@ def main():
             )
 
             # Handle persons (director, writer, cast)
+            triples = []
             for role in ["Director", "Writer", "Actors"]:
                 names = (omdb_data.get(role) or "").split(",")
                 for name in (n.strip() for n in names):
                     if not name:
                         continue
                     person_id = upsert_person(conn, name)
-                    upsert_film_person(
-                        conn, film["id"], person_id, role.lower() if role != "Actors" else "cast")
+                    triples.append(
+                        (film["id"], person_id, role.lower() if role != "Actors" else "cast"))
+            upsert_film_persons_bulk(conn, triples)
 
         conn.commit()
         print(f"\nDone. OMDb updated: {found}  |  Not found: {not_found}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ from pathlib import Path
 import requests
 import pymysql
 from dotenv import load_dotenv
-from db_helper import DB, conn_open, norm_title, remove_parentheses
+from db_helper import DB, conn_close, conn_open, norm_title, remove_parentheses
 
 # ---------- Config ----------
 # Load environment variables from .env in database directory
@@ -216,7 +216,7 @@ def main():
     print(
         f"Done. Updated IDs {updated}, Not found: {not_found}, IMDb URLs filled: {filled}")
     conn.commit()
-    conn.close()
+    conn_close(conn)
 
 
 if __name__ == "__main__":
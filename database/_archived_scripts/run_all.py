@@ -193,7 +193,7 @@ def main(argv: List[str] | None = None) -> None:
         try:
             if step == "merge":
                 from pathlib import Path
-                from db_helper import conn_open
+                from db_helper import conn_close, conn_open
 
                 sql_path = Path(__file__).resolve(
                 ).parents[1] / "etl" / "merge_staging_to_live.sql"
@@ -212,7 +212,7 @@ def main(argv: List[str] | None = None) -> None:
                         conn.rollback()
                         raise
                     finally:
-                        conn.close()
+                        conn_close(conn)
 
                 run_merge(sql_path)
 
@@ -1,9 +1,47 @@
+import asyncio
+import atexit
+import hashlib
 import json
 import os
-from openai import OpenAI
+import re
+import shelve
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from openai import AsyncOpenAI, OpenAI
 
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
+MODEL = "gpt-4.1-mini"
+
+# Upper bound on in-flight requests for ai_clean_titles_batch
+MAX_CONCURRENT_REQUESTS = 20
+
+# API results persist here across runs, keyed by model + system prompt hash
+# + raw title, so a prompt edit misses the old entries. Delete the file(s)
+# to re-clean everything or drop stale entries.
+AI_CACHE_PATH = os.environ.get(
+    "AI_TITLE_CACHE_PATH",
+    str(Path(__file__).resolve().parent.parent / ".ai_title_cache"),
+)
+
+_shelf = None
+_shelf_lock = threading.Lock()
+
+# Markers for everything SYSTEM_PROMPT asks the model to strip. Titles
+# matching none of them are already clean and never reach the API.
+_MARKER_WORDS = (
+    r"\bq\s*(?:&|and)\s*a\b"
+    r"|\b(?:4k|imax|3d|35\s*mm|70\s*mm)\b"
+    r"|\bremaster|\brestor|\banniversar|\bedition\b"
+    r"|\bin person\b|\bin attendance\b|\bguest|\bhosted by\b|\bintroduc|\bpanel\b"
+    r"|\blive (?:score|music)\b|\bmusician"
+)
+_DIRTY_RE = re.compile(r"[(\[\-:]|" + _MARKER_WORDS, re.I)
+_MARKER_RE = re.compile(_MARKER_WORDS, re.I)
+
 SYSTEM_PROMPT = """
 You are a cinema screening data–cleaning assistant. You will receive a raw film title
 that may contain screening-specific information. Your job is to:
@@ -99,32 +137,15 @@ Do NOT output anything else.
 """
 
 
-def ai_clean_title_and_tags(raw_title: str) -> dict:
-    """
-    Call the ChatGPT API to:
-    - normalize a film title (normalized_title)
-    - extract screening tags (screening_tags: list[str])
+def _messages(raw_title: str) -> list:
+    # SYSTEM_PROMPT stays first and unchanged so the prompt prefix is cached
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Raw title: {raw_title}"}
+    ]
 
-    The caller is responsible for handling fallback when errors happen.
-    """
-    if not raw_title:
-        return {
-            "original_title": "",
-            "normalized_title": "",
-            "screening_tags": [],
-        }
-
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"Raw title: {raw_title}"}
-        ],
-        # Force JSON output to reduce hallucination
-        response_format={"type": "json_object"},
-    )
 
-    content = resp.choices[0].message.content
+def _parse_response(raw_title: str, content: str) -> dict:
     try:
         data = json.loads(content)
     except json.JSONDecodeError:
@@ -149,3 +170,215 @@ def ai_clean_title_and_tags(raw_title: str) -> dict:
         "normalized_title": normalized,
         "screening_tags": tags,
     }
+
+
+# Deterministic version of the SYSTEM_PROMPT rules: each pattern is a
+# screening modifier and the tag it yields (None: strip without a tag).
+# Longer phrases come first so "4K restoration" wins over "4K".
+_RULES = [
+    (re.compile(p, re.I), tag) for p, tag in (
+        (r"\b4k\s+restor(?:ation|ed)\b", "4K restoration"),
+        (r"\b4k\s+remaster(?:ed)?\b", "4K remaster"),
+        (r"\b4k\b", "4K"),
+        (r"\brestor(?:ation|ed)\b", "Restoration"),
+        (r"\bremaster(?:ed)?\b", "Remaster"),
+        (r"\b35\s*mm\b", "35mm print"),
+        (r"\b70\s*mm\b", "70mm print"),
+        (r"\bimax\b", "IMAX screening"),
+        (r"\b3d\b", "3D"),
+        (r"\b(?:\d+(?:st|nd|rd|th)\s+)?anniversary\b", "Anniversary screening"),
+        (r"\bspecial\s+edition\b", None),
+        (r"\bq\s*(?:&|and)\s*a\b", "Q&A"),
+        (r"\bpost[-\s]screening\s+discussion\b", "Post-screening discussion"),
+        (r"\bdirectors?\s+in\s+(?:person|attendance)\b", "Director in attendance"),
+        (r"\bfilmmakers?\s+in\s+(?:person|attendance)\b", "Filmmaker in attendance"),
+        (r"\bguests?\s+in\s+attendance\b", "Guest in attendance"),
+        (r"\bspecial\s+guests?\b", "Special guest"),
+        (r"\bintroduction\b", "Introduction"),
+        (r"\bpanel(?:\s+discussion)?\b", "Panel discussion"),
+        (r"\blive\s+score\b", "Live score"),
+        (r"\blive\s+music\b", "Live music"),
+    )
+]
+
+# Connective words that may surround modifiers ("with Q&A", "in 70mm")
+_FILLER_RE = re.compile(
+    r"\b(?:with|and|in|plus|the|a|an|new|screening|presentation|print|version|edition)\b"
+    r"|[&+,/.!;:\-–—]",
+    re.I,
+)
+_BRACKET_RE = re.compile(r"\s*[(\[]([^()\[\]]*)[)\]]")
+_SEPARATOR_RE = re.compile(r"(\s+[-–—]\s+|:\s+)")
+
+
+def _strip_modifiers(text: str):
+    """Return (modifiers_only, tags) for one piece of a title."""
+    tags = []
+    matched = False
+    for rx, tag in _RULES:
+        text, n = rx.subn(" ", text)
+        if n:
+            matched = True
+            if tag and tag not in tags:
+                tags.append(tag)
+    only_modifiers = matched and not _FILLER_RE.sub("", text).strip()
+    return only_modifiers, tags
+
+
+def rule_clean_title_and_tags(raw_title: str) -> Optional[dict]:
+    """
+    Apply the SYSTEM_PROMPT rules locally.
+
+    Returns the same dict as ai_clean_title_and_tags, or None when the
+    title is ambiguous (unknown bracketed text, modifiers mixed with other
+    words such as a host's name) and should go to the LLM instead.
+    """
+    if not raw_title:
+        return {
+            "original_title": "",
+            "normalized_title": "",
+            "screening_tags": [],
+        }
+    if not _DIRTY_RE.search(raw_title):
+        return {
+            "original_title": raw_title,
+            "normalized_title": raw_title,
+            "screening_tags": [],
+        }
+
+    tags = []
+
+    def add(found):
+        tags.extend(t for t in found if t not in tags)
+
+    # 1) Bracketed groups must be modifiers only
+    title = raw_title
+    for m in _BRACKET_RE.finditer(raw_title):
+        only_modifiers, found = _strip_modifiers(m.group(1))
+        if not only_modifiers:
+            return None
+        add(found)
+        title = title.replace(m.group(0), " ", 1)
+    if any(ch in title for ch in "()[]"):
+        return None
+
+    # 2) Trailing " - ..." / ": ..." segments; a segment without modifiers
+    # is part of the real title ("Orwell: 2+2=5") and stops the scan
+    parts = _SEPARATOR_RE.split(title)
+    while len(parts) >= 3:
+        only_modifiers, found = _strip_modifiers(parts[-1])
+        if not only_modifiers:
+            break
+        add(found)
+        parts = parts[:-2]
+    title = "".join(parts)
+
+    # 3) Bare trailing modifiers ("Vertigo 4K Restoration", "Jaws with Q&A"):
+    # cut at the first word boundary after which only modifiers remain
+    for m in re.finditer(r"\s+", title):
+        only_modifiers, found = _strip_modifiers(title[m.end():])
+        if only_modifiers:
+            add(found)
+            title = title[:m.start()]
+            break
+
+    title = " ".join(title.split())
+    if not _FILLER_RE.sub("", title).strip() or _MARKER_RE.search(title):
+        return None
+
+    return {
+        "original_title": raw_title,
+        "normalized_title": title,
+        "screening_tags": tags,
+    }
+
+
+def ai_clean_title_and_tags(raw_title: str) -> dict:
+    """
+    Call the ChatGPT API to:
+    - normalize a film title (normalized_title)
+    - extract screening tags (screening_tags: list[str])
+
+    Titles that rule_clean_title_and_tags can resolve never reach the API.
+    The caller is responsible for handling fallback when errors happen.
+    """
+    local = rule_clean_title_and_tags(raw_title)
+    if local is not None:
+        return local
+    return _ai_clean_cached(raw_title)
+
+
+_PROMPT_HASH = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+def _cache_key(raw_title: str) -> str:
+    return f"{MODEL}|{_PROMPT_HASH}|{raw_title}"
+
+
+def _cache_get(raw_title: str) -> Optional[dict]:
+    global _shelf
+    with _shelf_lock:
+        if _shelf is None:
+            _shelf = shelve.open(AI_CACHE_PATH)
+            atexit.register(_shelf.close)
+        return _shelf.get(_cache_key(raw_title))
+
+
+def _cache_put(raw_title: str, result: dict) -> None:
+    with _shelf_lock:
+        _shelf[_cache_key(raw_title)] = result
+
+
+@lru_cache(maxsize=10000)
+def _ai_clean_cached(raw_title: str) -> dict:
+    cached = _cache_get(raw_title)
+    if cached is not None:
+        return cached
+
+    resp = client.chat.completions.create(
+        model=MODEL,
+        messages=_messages(raw_title),
+        # Force JSON output to reduce hallucination
+        response_format={"type": "json_object"},
+    )
+
+    result = _parse_response(raw_title, resp.choices[0].message.content)
+    _cache_put(raw_title, result)
+    return result
+
+
+async def _clean_titles(titles: list) -> list:
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async with AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY")) as aclient:
+        async def one(raw_title: str) -> dict:
+            local = rule_clean_title_and_tags(raw_title)
+            if local is not None:
+                return local
+            cached = _cache_get(raw_title)
+            if cached is not None:
+                return cached
+            async with sem:
+                resp = await aclient.chat.completions.create(
+                    model=MODEL,
+                    messages=_messages(raw_title),
+                    response_format={"type": "json_object"},
+                )
+            result = _parse_response(
+                raw_title, resp.choices[0].message.content)
+            _cache_put(raw_title, result)
+            return result
+
+        return await asyncio.gather(
+            *(one(t) for t in titles), return_exceptions=True)
+
+
+def ai_clean_titles_batch(titles: list) -> list:
+    """
+    Clean many titles concurrently (at most MAX_CONCURRENT_REQUESTS in flight).
+
+    Returns a list aligned with `titles`. Each entry is the same dict that
+    ai_clean_title_and_tags returns, or the exception raised for that
+    title; as with the single-title call, fallback is up to the caller.
+    """
+    return asyncio.run(_clean_titles(list(titles)))
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import re
+import sys
 import unicodedata
+from functools import lru_cache
 from typing import Dict, Tuple, Optional
 
 # Keyed by (source_name, alias_name) → canonical cinema name
@@ -21,6 +23,13 @@ GLOBAL_ALIASES: Dict[str, str] = {
 }
 
 
+# Punctuation mapped to spaces in one translate pass (the curly quotes
+# are listed here so they become spaces before the ASCII fold drops them)
+_PUNCT_TABLE = str.maketrans({c: " " for c in ".,;:!/?()[]{}\"“”‘’"})
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=65536)
 def _normalize(s: str) -> str:
     """
     Normalize a cinema name for matching:
@@ -33,26 +42,33 @@ def _normalize(s: str) -> str:
     if not s:
         return ""
 
-    # Unicode normalize and strip accents
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-
-    # Lowercase (casefold is more robust)
-    s = s.casefold()
-
-    # Replace common joiners
-    s = s.replace("&", "and")
+    # Unicode normalize, map punctuation to spaces, then strip accents
+    # (combining marks are non-ASCII, so the ASCII encode drops them)
+    s = unicodedata.normalize("NFKD", s).translate(_PUNCT_TABLE)
+    s = s.encode("ascii", "ignore").decode("ascii")
 
-    # Remove punctuation except intra-word hyphens/apostrophes
-    s = re.sub(r"[.,;:!/?()\[\]{}\"“”‘’]+", " ", s)
+    # Lowercase (casefold is more robust) and replace common joiners
+    s = s.casefold().replace("&", "and")
 
     # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
 
     # Drop leading article "the "
-    s = re.sub(r"^the\s+", "", s)
+    if s.startswith("the "):
+        s = s[4:]
 
-    return s
+    return sys.intern(s)
+
+
+# Lookup tables keyed by normalized names, built once at import so the
+# hand-written keys above match whatever _normalize makes of the input.
+_NORM_CINEMA_ALIASES: Dict[Tuple[str, str], str] = {
+    (_normalize(src), _normalize(name)): canonical
+    for (src, name), canonical in CINEMA_ALIASES.items()
+}
+_NORM_GLOBAL_ALIASES: Dict[str, str] = {
+    _normalize(name): canonical for name, canonical in GLOBAL_ALIASES.items()
+}
 
 
 def resolve_cinema_alias(source: str, scraped_name: str) -> Optional[str]:
@@ -68,12 +84,12 @@ def resolve_cinema_alias(source: str, scraped_name: str) -> Optional[str]:
     nn = _normalize(scraped_name)
 
     # 1) Per-source lookup
-    hit = CINEMA_ALIASES.get((ns, nn))
+    hit = _NORM_CINEMA_ALIASES.get((ns, nn))
     if hit:
         return hit
 
     # 2) Global fallback
-    hit = GLOBAL_ALIASES.get(nn)
+    hit = _NORM_GLOBAL_ALIASES.get(nn)
     if hit:
         return hit
 
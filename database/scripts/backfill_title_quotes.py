@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+One-off backfill: fold U+2018 (left single quote) in film.normalized_title.
+
+norm_title (db_helper) maps both curly single quotes to "'". It used to map
+only U+2019, so titles stored before that change may still contain U+2018
+and no longer match their re-imported versions. Run this once after
+deploying the change, before the next load_json run.
+
+- Rewrites normalized_title for every film containing U+2018
+- Skips films whose folded key (normalized_title, year) is already taken:
+  those are duplicates already; they are listed so they can be added to
+  MANUAL_MERGES in merge_films_manual.py
+
+Usage:
+    python scripts/backfill_title_quotes.py [--dry-run]
+"""
+
+import sys
+
+from db_helper import conn_close, conn_open
+
+# Film o holds f's folded key: either already (stored without U+2018) or
+# after this backfill (a smaller id that folds to the same title)
+_TAKEN = """
+    o.id <> f.id
+    AND o.year IS NOT DISTINCT FROM f.year
+    AND replace(o.normalized_title, U&'\\2018', '''')
+        = replace(f.normalized_title, U&'\\2018', '''')
+    AND (o.normalized_title NOT LIKE U&'%\\2018%' OR o.id < f.id)
+"""
+
+# Films whose folded key collides with another film
+_CONFLICTS_SQL = f"""
+    SELECT f.id, o.id, f.normalized_title, f.year
+    FROM film f
+    JOIN film o ON {_TAKEN}
+    WHERE f.normalized_title LIKE U&'%\\2018%'
+    ORDER BY f.id
+"""
+
+_BACKFILL_SQL = f"""
+    UPDATE film f
+    SET normalized_title = replace(f.normalized_title, U&'\\2018', '''')
+    WHERE f.normalized_title LIKE U&'%\\2018%'
+      AND NOT EXISTS (SELECT 1 FROM film o WHERE {_TAKEN})
+"""
+
+
+def main() -> None:
+    dry_run = "--dry-run" in sys.argv
+
+    conn = conn_open()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_CONFLICTS_SQL)
+            conflicts = cur.fetchall()
+            for film_id, other_id, title, year in conflicts:
+                print(f"[SKIP] film {film_id} ({title!r}, {year}) duplicates "
+                      f"film {other_id} once folded; merge them manually")
+
+            cur.execute(_BACKFILL_SQL)
+            updated = cur.rowcount
+
+        if dry_run:
+            conn.rollback()
+            print(f"[DRY RUN] Would update {updated} films; "
+                  f"{len(conflicts)} skipped as duplicates")
+        else:
+            conn.commit()
+            print(f"Updated {updated} films; "
+                  f"{len(conflicts)} skipped as duplicates")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn_close(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # db_helper.py — PostgreSQL version
+import atexit
 import os
 import re
 import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 # ---------- Load environment ----------
@@ -27,65 +31,244 @@ if not DATABASE_URL:
     sys.exit(1)
 
 
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+
+
 # ---------- Connection ----------
+# One process-wide pool, created on first use, so steps run back to back
+# (e.g. by run_all.py) reuse sockets instead of reconnecting each time.
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# ThreadedConnectionPool raises PoolError when every connection is lent
+# out; this makes conn_open() wait for a free slot instead, so worker
+# threads can share the pool safely.
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """Connection that remembers whether its prepared statements exist."""
+    statements_prepared = False
+    merge_film_group_prepared = False
+
+
+# Server-side prepared statements (person lookups used by upsert_person).
+# They live as long as the session, so each pooled connection prepares
+# them only once.
+_PREPARED_STATEMENTS = (
+    "PREPARE p_by_imdb AS SELECT id FROM person WHERE imdb_id = $1",
+    "PREPARE p_by_tmdb AS SELECT id FROM person WHERE tmdb_id = $1",
+    "PREPARE p_by_norm AS SELECT id FROM person WHERE normalized_name = $1",
+    # insert-or-select: an existing row is returned without being rewritten
+    """
+    PREPARE p_ins_person AS
+    WITH ins AS (
+        INSERT INTO person (name, imdb_id, tmdb_id, normalized_name)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (normalized_name) DO NOTHING
+        RETURNING id
+    )
+    SELECT id FROM ins
+    UNION ALL
+    SELECT id FROM person WHERE normalized_name = $4
+    LIMIT 1
+    """,
+)
+
+
+# Whole-group film merge used by merge_duplicate_films and merge_films_manual
+# ($1 = kept id, $2 = losing ids), prepared on demand by
+# prepare_merge_film_group. All parts see the same snapshot, so each one
+# touches a disjoint set of rows:
+#   1) screening: slots still free on the kept film move (and only the
+#      smallest-id loser row per slot); the rest are exact duplicates
+#      and are deleted, avoiding UNIQUE (cinema_id, film_id, start_at_utc)
+#   2) stg_screening: no uniqueness on (cinema_id, film_id, start_at_utc)
+#   3) film_person: copy to the kept film (ON CONFLICT DO NOTHING), then
+#      drop the losers' rows
+#   4) delete the losing film rows; FK checks run at statement end,
+#      after every reference has moved
+_MERGE_FILM_GROUP_STATEMENT = """
+PREPARE p_merge_film_group (int, int[]) AS
+WITH slot_taken AS (
+    SELECT s.id
+    FROM screening s
+    WHERE s.film_id = ANY($2)
+      AND EXISTS (
+          SELECT 1
+          FROM screening k
+          WHERE k.cinema_id = s.cinema_id
+            AND k.start_at_utc = s.start_at_utc
+            AND (k.film_id = $1
+                 OR (k.film_id = ANY($2) AND k.id < s.id))
+      )
+),
+del_screening AS (
+    DELETE FROM screening
+    WHERE id IN (SELECT id FROM slot_taken)
+),
+upd_screening AS (
+    UPDATE screening
+    SET film_id = $1
+    WHERE film_id = ANY($2)
+      AND id NOT IN (SELECT id FROM slot_taken)
+),
+upd_stg AS (
+    UPDATE stg_screening
+    SET film_id = $1
+    WHERE film_id = ANY($2)
+),
+ins_fp AS (
+    INSERT INTO film_person (film_id, person_id, role)
+    SELECT $1, person_id, role
+    FROM film_person
+    WHERE film_id = ANY($2)
+    ON CONFLICT (film_id, person_id, role) DO NOTHING
+),
+del_fp AS (
+    DELETE FROM film_person
+    WHERE film_id = ANY($2)
+)
+DELETE FROM film
+WHERE id = ANY($2)
+"""
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(
+                DB_POOL_MIN, DB_POOL_MAX, DATABASE_URL,
+                connection_factory=_PooledConnection)
+        return _pool
+
+
+def _prepare_statements(conn) -> None:
+    with conn.cursor() as cursor:
+        for stmt in _PREPARED_STATEMENTS:
+            cursor.execute(stmt)
+    conn.commit()
+    conn.statements_prepared = True
+
+
+def prepare_merge_film_group(conn) -> None:
+    """
+    Prepare p_merge_film_group on conn unless it already has been. Only the
+    merge scripts need it, so it is not part of _PREPARED_STATEMENTS.
+    PREPARE is not transactional: it survives a rollback, and the caller's
+    open transaction is left alone.
+    """
+    if conn.merge_film_group_prepared:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(_MERGE_FILM_GROUP_STATEMENT)
+    conn.merge_film_group_prepared = True
+
 def conn_open():
-    """Open a new PostgreSQL connection using DATABASE_URL."""
+    """
+    Borrow a PostgreSQL connection from the pool (see conn_close).
+    Blocks while all DB_POOL_MAX connections are in use.
+    """
+    _pool_slots.acquire()
+    conn = None
     try:
-        return psycopg2.connect(DATABASE_URL)
+        pool = _get_pool()
+        conn = pool.getconn()
+        if not conn.statements_prepared:
+            _prepare_statements(conn)
+        return conn
     except Exception as e:
+        if conn is not None:
+            pool.putconn(conn, close=True)
+        _pool_slots.release()
         print(f"Error: Failed to connect to Postgres: {e}", file=sys.stderr)
         raise
 
 
+def conn_close(conn) -> None:
+    """Return a connection to the pool; uncommitted work is rolled back."""
+    if _pool is None:
+        conn.close()
+    else:
+        _pool.putconn(conn)
+    _pool_slots.release()
+
+
+def close_all() -> None:
+    """Close every pooled connection (registered to run at exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+atexit.register(close_all)
+
+
 # ---------- Text normalization helpers ----------
+_WS_RE = re.compile(r"\s+")
+_DIR_RE = re.compile(r"^\s*dir\.?\s*", re.I)
+_QUOTE_TABLE = str.maketrans({"\u2019": "'", "\u2018": "'"})
+_PERIOD_TABLE = str.maketrans({".": None})
+
+
 def norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", s.strip())
+    return _WS_RE.sub(" ", s.strip())
 
 
 def norm_title(t: Optional[str]) -> str:
     if not t:
         return ""
-    t = t.replace("’", "'")
-    return norm_space(t).lower()
+    return _WS_RE.sub(" ", t.translate(_QUOTE_TABLE).strip()).lower()
 
 
 def strip_dir_prefix(name: Optional[str]) -> Optional[str]:
     if not name:
         return None
-    return re.sub(r"^\s*dir\.?\s*", "", name, flags=re.I)
+    return _DIR_RE.sub("", name)
 
 
 def remove_parentheses(text: str) -> str:
     """Remove all parentheses and their contents."""
-    result = text
-    while True:
-        new_result = re.sub(r"\([^()]*\)", "", result)
-        if new_result == result:
-            new_result = re.sub(r"\([^)]*$", "", result)
-            return norm_space(new_result)
-        result = new_result
+    # Single left-to-right scan tracking nesting depth; an unclosed "("
+    # drops everything after it, a stray ")" is kept as-is.
+    out = []
+    depth = 0
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")" and depth:
+            depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    return norm_space("".join(out))
 
 
+@lru_cache(maxsize=65536)
 def normalize_person_name(name: str) -> str:
     """Normalize person names for deduplication."""
     if not name or not name.strip():
         return ""
 
-    name = norm_space(name).strip()
+    # drop periods first, then swap "Last, First" and collapse whitespace
+    # once at the end
+    name = name.translate(_PERIOD_TABLE)
     if "," in name:
-        parts = [p.strip() for p in name.split(",", 1)]
-        if len(parts) == 2:
-            name = f"{parts[1]} {parts[0]}"
-    name = name.replace(".", "")
-    name = norm_space(name)
-    return name.lower()
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    name = _WS_RE.sub(" ", name).strip()
+    # interned so every {normalized_name: id} map shares one object per name
+    return sys.intern(name.lower())
 
 
 # ---------- Database operations ----------
 def upsert_person(conn, name, imdb_id=None, tmdb_id=None):
     """
     Find or create a person record.
-    Uses PostgreSQL ON CONFLICT syntax.
+    Uses PostgreSQL ON CONFLICT DO NOTHING with a select fallback.
     """
     if not name or not name.strip():
         raise ValueError("Person name cannot be empty")
@@ -97,39 +280,133 @@ def upsert_person(conn, name, imdb_id=None, tmdb_id=None):
     with conn.cursor() as cursor:
         # 1. Lookup by external IDs
         if imdb_id:
-            cursor.execute(
-                "SELECT id FROM person WHERE imdb_id = %s", (imdb_id,))
+            cursor.execute("EXECUTE p_by_imdb (%s)", (imdb_id,))
             row = cursor.fetchone()
             if row:
                 return row[0]
 
         if tmdb_id:
-            cursor.execute(
-                "SELECT id FROM person WHERE tmdb_id = %s", (tmdb_id,))
+            cursor.execute("EXECUTE p_by_tmdb (%s)", (tmdb_id,))
             row = cursor.fetchone()
             if row:
                 return row[0]
 
-        # 2. Lookup by normalized name
+        # 2. Insert, or select the existing row by normalized name, in one
+        # round-trip; DO NOTHING leaves existing rows untouched
         cursor.execute(
-            "SELECT id FROM person WHERE normalized_name = %s", (norm_name,))
+            "EXECUTE p_ins_person (%s, %s, %s, %s)",
+            (name, imdb_id, tmdb_id, norm_name),
+        )
         row = cursor.fetchone()
         if row:
             return row[0]
 
-        # 3. Insert or update existing record
-        cursor.execute(
+        # A concurrent insert committed after this statement's snapshot
+        # was taken; it is visible to a fresh statement.
+        cursor.execute("EXECUTE p_by_norm (%s)", (norm_name,))
+        return cursor.fetchone()[0]
+
+
+def _external_id_count(row: tuple) -> int:
+    return int(bool(row[1])) + int(bool(row[2]))
+
+
+def lookup_persons_bulk(
+    conn, imdb_ids=(), tmdb_ids=(), norm_names=()
+) -> Dict[str, Dict[Any, int]]:
+    """
+    Resolve many person keys with one SELECT per key space.
+
+    Returns {"imdb_id": {...}, "tmdb_id": {...}, "normalized_name": {...}},
+    each mapping a key value to its person id. tmdb keys are ints.
+    """
+    out: Dict[str, Dict[Any, int]] = {
+        "imdb_id": {}, "tmdb_id": {}, "normalized_name": {}}
+    queries = (
+        ("imdb_id", "SELECT id, imdb_id FROM person WHERE imdb_id = ANY(%s)",
+         [x for x in set(imdb_ids) if x]),
+        ("tmdb_id", "SELECT id, tmdb_id FROM person WHERE tmdb_id = ANY(%s::int[])",
+         [int(x) for x in set(tmdb_ids) if x]),
+        ("normalized_name", "SELECT id, normalized_name FROM person WHERE normalized_name = ANY(%s)",
+         [x for x in set(norm_names) if x]),
+    )
+    with conn.cursor() as cursor:
+        for field, sql, values in queries:
+            if not values:
+                continue
+            cursor.execute(sql + " ORDER BY id", (values,))
+            for person_id, value in cursor.fetchall():
+                # keep the lowest id if a key is (still) duplicated
+                out[field].setdefault(value, person_id)
+    return out
+
+
+def upsert_persons_bulk(conn, persons: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Find or create many person records with a fixed number of statements.
+
+    Each item is a dict with "name" and optional "imdb_id" / "tmdb_id".
+    Like upsert_person, existing rows are matched by imdb_id, then tmdb_id,
+    then normalized name (one bulk SELECT per key); only the misses are
+    inserted. Rows are deduplicated by normalized name first (keeping the
+    variant with the most external IDs), since ON CONFLICT cannot touch
+    the same row twice in one statement.
+
+    Returns {normalized_name: person_id}.
+    """
+    rows: Dict[str, tuple] = {}
+    for p in persons:
+        name = p.get("name")
+        norm_name = normalize_person_name(name)
+        if not norm_name:
+            continue
+        row = (name, p.get("imdb_id"), p.get("tmdb_id"), norm_name)
+        prev = rows.get(norm_name)
+        if prev is None or _external_id_count(row) > _external_id_count(prev):
+            rows[norm_name] = row
+
+    if not rows:
+        return {}
+
+    found = lookup_persons_bulk(
+        conn,
+        imdb_ids=[r[1] for r in rows.values()],
+        tmdb_ids=[r[2] for r in rows.values()],
+        norm_names=list(rows),
+    )
+    ids: Dict[str, int] = {}
+    for norm_name, (_, imdb_id, tmdb_id, _) in rows.items():
+        person_id = (
+            (imdb_id and found["imdb_id"].get(imdb_id))
+            or (tmdb_id and found["tmdb_id"].get(int(tmdb_id)))
+            or found["normalized_name"].get(norm_name)
+        )
+        if person_id:
+            ids[norm_name] = person_id
+
+    # sorted so concurrent callers take row locks in the same order
+    misses = [row for norm_name, row in sorted(rows.items())
+              if norm_name not in ids]
+    if not misses:
+        return ids
+
+    with conn.cursor() as cursor:
+        result = execute_values(
+            cursor,
             """
             INSERT INTO person (name, imdb_id, tmdb_id, normalized_name)
-            VALUES (%s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (normalized_name)
-            DO UPDATE SET name = EXCLUDED.name
-            RETURNING id
+            DO UPDATE SET imdb_id = COALESCE(person.imdb_id, EXCLUDED.imdb_id),
+                          tmdb_id = COALESCE(person.tmdb_id, EXCLUDED.tmdb_id)
+            RETURNING id, normalized_name
             """,
-            (name, imdb_id, tmdb_id, norm_name),
+            misses,
+            page_size=500,
+            fetch=True,
         )
-        new_id = cursor.fetchone()[0]
-        return new_id
+    ids.update((norm_name, person_id) for person_id, norm_name in result)
+    return ids
 
 
 def upsert_film_person(conn, film_id, person_id, role):
@@ -145,8 +422,37 @@ def upsert_film_person(conn, film_id, person_id, role):
         )
 
 
+def upsert_film_persons_bulk(conn, triples: List[tuple]) -> None:
+    """Link many (film_id, person_id, role) triples in one statement."""
+    if not triples:
+        return
+    with conn.cursor() as cursor:
+        execute_values(
+            cursor,
+            """
+            INSERT INTO film_person (film_id, person_id, role)
+            VALUES %s
+            ON CONFLICT (film_id, person_id, role) DO NOTHING
+            """,
+            triples,
+            page_size=500,
+        )
+
+
+def iter_all_films(conn, itersize: int = 1000):
+    """
+    Yield all films as dictionaries using a server-side cursor.
+
+    Rows are fetched from Postgres `itersize` at a time instead of being
+    buffered all at once. The cursor lives in the current transaction, so
+    the caller must not commit until it has finished iterating.
+    """
+    with conn.cursor(name="films_iter", cursor_factory=RealDictCursor) as cursor:
+        cursor.itersize = itersize
+        cursor.execute("SELECT id, title, year, imdb_id, tmdb_id FROM film")
+        yield from cursor
+
+
 def fetch_all_films(conn):
     """Fetch all films as a list of dictionaries."""
-    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        cursor.execute("SELECT id, title, year, imdb_id, tmdb_id FROM film")
-        return cursor.fetchall()
+    return list(iter_all_films(conn))
@@ -35,7 +35,9 @@ Examples:
 import argparse
 from datetime import datetime, timedelta
 
-from db_helper import conn_open
+import psycopg2.errors
+
+from db_helper import conn_close, conn_open
 
 
 # ---------------------------------------------------------------------------
@@ -48,6 +50,17 @@ def parse_iso_datetime(value: str) -> datetime:
       2025-11-25T19:30  or  2025-11-25 19:30  (seconds optional)
     """
     value = value.strip()
+    # C fast path, only for values shaped exactly like the formats below
+    # (YYYY-MM-DD, 'T' or ' ', HH:MM, optional :SS), so fromisoformat's
+    # wider grammar (offsets, fractions, "T19", basic format) still falls
+    # through to the loop and is rejected, as before
+    if (len(value) in (16, 19) and value[10] in "T "
+            and value[4] == value[7] == "-" and value[13] == ":"
+            and (len(value) == 16 or value[16] == ":")):
+        try:
+            return datetime.fromisoformat(value.replace(" ", "T", 1))
+        except ValueError:
+            pass
     for fmt in ("%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M",
                 "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
         try:
@@ -59,12 +72,19 @@ def parse_iso_datetime(value: str) -> datetime:
 
 def ensure_film_and_cinema(cur, film_id: int, cinema_id: int) -> None:
     """Raise argparse.ArgumentTypeError if either FK does not exist."""
-    cur.execute("SELECT 1 FROM film WHERE id = %s", (film_id,))
-    if not cur.fetchone():
+    # One round-trip checks both keys
+    cur.execute(
+        """
+        SELECT EXISTS (SELECT 1 FROM film WHERE id = %s),
+               EXISTS (SELECT 1 FROM cinema WHERE id = %s)
+        """,
+        (film_id, cinema_id),
+    )
+    film_exists, cinema_exists = cur.fetchone()
+    if not film_exists:
         raise argparse.ArgumentTypeError(f"film.id={film_id} does not exist")
 
-    cur.execute("SELECT 1 FROM cinema WHERE id = %s", (cinema_id,))
-    if not cur.fetchone():
+    if not cinema_exists:
         raise argparse.ArgumentTypeError(
             f"cinema.id={cinema_id} does not exist")
 
@@ -161,7 +181,7 @@ def cmd_create(args):
                 new_id = cur.fetchone()[0]
                 print(f"Created screening id={new_id}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 def cmd_update(args):
@@ -180,27 +200,6 @@ def cmd_update(args):
     try:
         with conn:
             with conn.cursor() as cur:
-                # Load current row to know film_id/cinema_id defaults
-                cur.execute(
-                    """
-          SELECT film_id, cinema_id
-          FROM screening
-          WHERE id = %s
-          """,
-                    (args.id,),
-                )
-                row = cur.fetchone()
-                if not row:
-                    print(f"No screening found with id={args.id}")
-                    return
-
-                current_film_id, current_cinema_id = row
-
-                # If changing film_id or cinema_id, validate FKs
-                new_film_id = args.film_id if args.film_id is not None else current_film_id
-                new_cinema_id = args.cinema_id if args.cinema_id is not None else current_cinema_id
-                ensure_film_and_cinema(cur, new_film_id, new_cinema_id)
-
                 sets = []
                 params = []
 
@@ -262,14 +261,23 @@ def cmd_update(args):
         """
                 params.append(args.id)
 
-                cur.execute(sql, params)
+                # The screening FKs validate a new film_id / cinema_id, so
+                # no preflight SELECTs are needed
+                try:
+                    cur.execute(sql, params)
+                except psycopg2.errors.ForeignKeyViolation as e:
+                    if "film_id" in (e.diag.constraint_name or ""):
+                        raise argparse.ArgumentTypeError(
+                            f"film.id={args.film_id} does not exist") from e
+                    raise argparse.ArgumentTypeError(
+                        f"cinema.id={args.cinema_id} does not exist") from e
                 updated = cur.fetchone()
                 if not updated:
                     print(f"No screening found with id={args.id}")
                 else:
                     print(f"Updated screening id={args.id}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 def cmd_deactivate(args):
@@ -297,7 +305,7 @@ def cmd_deactivate(args):
                 else:
                     print(f"Deactivated screening id={args.id}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 def cmd_delete(args):
@@ -320,7 +328,7 @@ def cmd_delete(args):
                 else:
                     print(f"Deleted screening id={args.id}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -3,9 +3,11 @@
 Enrich person records with TMDB and IMDb IDs (PostgreSQL version).
 
 This script:
-1) Finds all persons without external IDs
+1) Finds all persons without external IDs (skipping names that were not
+   found within the last RETRY_AFTER_DAYS days)
 2) Searches TMDB API for each person
-3) Updates the database with found IDs
+3) Updates the database with found IDs and records each attempt in
+   person_enrich_attempt
 
 Usage:
     python scripts/enrich_person_ids.py
@@ -13,18 +15,24 @@ Usage:
 Environment:
     Requires TMDB_API_KEY in database/.env
     Requires DATABASE_URL in database/.env (used by db_helper.conn_open)
+    Optional TMDB_WORKERS (default 8): concurrent TMDB lookups
 """
 
 import os
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 
 import requests
 from dotenv import load_dotenv
+from psycopg2.extras import execute_values
 
-from db_helper import conn_open
+from db_helper import conn_close, conn_open
 
 # ---------- Environment ----------
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -45,43 +53,94 @@ if not TMDB_API_KEY:
 
 TMDB_BASE = "https://api.themoviedb.org/3"
 
-# Use a single session for connection reuse + timeouts
-HTTP = requests.Session()
-HTTP.headers.update({"Accept": "application/json"})
+# Matched persons buffered per UPDATE statement
+UPDATE_BATCH_SIZE = 500
+
+# Persons not found on TMDB are searched again only after this many days
+RETRY_AFTER_DAYS = 30
+
+# Concurrent TMDB lookups, and the request budget they share (TMDB
+# allows ~50 requests/second)
+TMDB_WORKERS = int(os.getenv("TMDB_WORKERS", "8"))
+TMDB_MAX_REQUESTS_PER_SEC = 40
+
+# requests.Session is not thread-safe, so each worker thread gets its own
+# (kept for connection reuse across that thread's lookups)
+_http_local = threading.local()
+
+
+def _http() -> requests.Session:
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"Accept": "application/json"})
+        _http_local.session = session
+    return session
+
+
+class RateLimiter:
+    """Sliding-window limiter: at most `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
+
+
+_limiter = RateLimiter(TMDB_MAX_REQUESTS_PER_SEC)
 
 
 # ---------- TMDB helpers ----------
-def _tmdb_get(path: str, params: Dict) -> Optional[Dict]:
+class TMDBRequestError(Exception):
+    """A TMDB request failed (non-200, timeout, ...), as opposed to no match."""
+
+
+def _tmdb_get(path: str, params: Dict) -> Dict:
+    """GET a TMDB endpoint; raises TMDBRequestError unless it answers 200."""
     p = dict(params or {})
     p["api_key"] = TMDB_API_KEY
+    _limiter.acquire()
     try:
-        r = HTTP.get(f"{TMDB_BASE}/{path}", params=p, timeout=15)
+        r = _http().get(f"{TMDB_BASE}/{path}", params=p, timeout=15)
         if r.status_code == 200:
             return r.json()
-        # Log non-200 but keep going
-        print(
-            f"TMDB error {r.status_code} for {path}: {r.text[:200]}", file=sys.stderr)
-        return None
+        msg = f"TMDB error {r.status_code} for {path}: {r.text[:200]}"
     except Exception as e:
-        print(f"TMDB request failed for {path}: {e}", file=sys.stderr)
-        return None
+        msg = f"TMDB request failed for {path}: {e}"
+    print(msg, file=sys.stderr)
+    raise TMDBRequestError(msg)
 
 
 def search_tmdb_person(name: str) -> Optional[Dict]:
-    """Return top TMDB search result for a person, or None."""
+    """
+    Return top TMDB search result for a person, or None if TMDB has no
+    match. Raises TMDBRequestError if the search itself failed.
+    """
     data = _tmdb_get("search/person", {"query": name})
-    time.sleep(0.3)  # be polite to the API
-    if not data:
-        return None
-    results = data.get("results", [])
+    results = data.get("results") or []
     return results[0] if results else None
 
 
+# Name variants of one person ("Kurosawa, Akira" / "Akira Kurosawa") resolve
+# to the same TMDB id; look its external IDs up once per run. Only answers
+# are cached: a failed request raises TMDBRequestError, which lru_cache does
+# not store, so the next variant asks TMDB again.
+@lru_cache(maxsize=None)
 def get_person_imdb_id_from_tmdb(tmdb_person_id: int) -> Optional[str]:
     data = _tmdb_get(f"person/{tmdb_person_id}/external_ids", {})
-    time.sleep(0.3)
-    if not data:
-        return None
     return data.get("imdb_id")
 
 
@@ -91,6 +150,9 @@ def enrich_person_ids(name: str) -> Dict[str, Optional[str]]:
 
     Returns:
       {"tmdb_id": "123", "imdb_id": "nm0000001"}  (values can be None)
+
+    Raises TMDBRequestError if a lookup failed, so the person is retried
+    on the next run instead of being recorded as not found.
     """
     out = {"tmdb_id": None, "imdb_id": None}
 
@@ -108,54 +170,118 @@ def enrich_person_ids(name: str) -> Dict[str, Optional[str]]:
     return out
 
 
+# ---------- DB helpers ----------
+def flush_updates(conn, pending: List[Tuple[int, Optional[str], Optional[str]]]) -> None:
+    """Write buffered (person_id, imdb_id, tmdb_id) rows in one UPDATE."""
+    if not pending:
+        return
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            UPDATE person
+            SET imdb_id = data.imdb_id, tmdb_id = data.tmdb_id
+            FROM (VALUES %s) AS data(id, imdb_id, tmdb_id)
+            WHERE person.id = data.id
+            """,
+            pending,
+            template="(%s, %s::varchar, %s::int)",
+            page_size=UPDATE_BATCH_SIZE,
+        )
+    pending.clear()
+
+
+def flush_attempts(conn, attempts: List[Tuple[int, str]]) -> None:
+    """Record buffered (person_id, status) lookups in person_enrich_attempt."""
+    if not attempts:
+        return
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO person_enrich_attempt (person_id, last_tried_at, status)
+            VALUES %s
+            ON CONFLICT (person_id)
+            DO UPDATE SET last_tried_at = EXCLUDED.last_tried_at,
+                          status = EXCLUDED.status
+            """,
+            attempts,
+            template="(%s, now(), %s::person_enrich_status)",
+            page_size=UPDATE_BATCH_SIZE,
+        )
+    attempts.clear()
+
+
 # ---------- Main ----------
 def main():
     conn = conn_open()
     try:
-        # Fetch people without external IDs
+        # Fetch people without external IDs, skipping recent failed lookups
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT id, name
-                FROM person
-                WHERE (imdb_id IS NULL OR imdb_id = '')
-                AND tmdb_id IS NULL
-                ORDER BY id
-            """)
+                SELECT p.id, p.name
+                FROM person p
+                LEFT JOIN person_enrich_attempt a ON a.person_id = p.id
+                WHERE (p.imdb_id IS NULL OR p.imdb_id = '')
+                AND p.tmdb_id IS NULL
+                AND (a.person_id IS NULL
+                     OR a.last_tried_at < now() - make_interval(days => %s))
+                ORDER BY p.id
+            """, (RETRY_AFTER_DAYS,))
             persons = cur.fetchall()
 
         print(f"Found {len(persons)} persons without external IDs\n")
 
         updated = 0
         not_found = 0
-
-        for person_id, name in persons:
-            print(f"Searching: {name} (id={person_id})")
-
-            ids = enrich_person_ids(name)
-
-            if ids.get("tmdb_id") or ids.get("imdb_id"):
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "UPDATE person SET imdb_id = %s, tmdb_id = %s WHERE id = %s",
-                        (ids.get("imdb_id"), ids.get("tmdb_id"), person_id),
-                    )
-                print(
-                    f"  ✅ TMDB: {ids.get('tmdb_id')}, IMDb: {ids.get('imdb_id')}\n")
-                updated += 1
-            else:
-                print("  ❌ Not found\n")
-                not_found += 1
-
-            # global throttle
-            time.sleep(0.5)
-
+        errored = 0
+        pending: List[Tuple[int, Optional[str], Optional[str]]] = []
+        attempts: List[Tuple[int, str]] = []
+
+        # TMDB calls run on worker threads (throttled by _limiter); results
+        # are collected here, so only this thread touches the connection
+        with ThreadPoolExecutor(max_workers=TMDB_WORKERS) as ex:
+            futures = {
+                ex.submit(enrich_person_ids, name): (person_id, name)
+                for person_id, name in persons
+            }
+            for fut in as_completed(futures):
+                person_id, name = futures[fut]
+                print(f"Searched: {name} (id={person_id})")
+                try:
+                    ids = fut.result()
+                except TMDBRequestError:
+                    # No attempt row: a failed request is not a miss
+                    print("  ⚠️  Lookup failed; will retry next run\n")
+                    errored += 1
+                    continue
+
+                if ids.get("tmdb_id") or ids.get("imdb_id"):
+                    pending.append(
+                        (person_id, ids.get("imdb_id"), ids.get("tmdb_id")))
+                    attempts.append((person_id, "found"))
+                    print(
+                        f"  ✅ TMDB: {ids.get('tmdb_id')}, IMDb: {ids.get('imdb_id')}\n")
+                    updated += 1
+                else:
+                    attempts.append((person_id, "not_found"))
+                    print("  ❌ Not found\n")
+                    not_found += 1
+
+                if len(attempts) >= UPDATE_BATCH_SIZE:
+                    flush_updates(conn, pending)
+                    flush_attempts(conn, attempts)
+
+        flush_updates(conn, pending)
+        flush_attempts(conn, attempts)
         conn.commit()
         print("=" * 50)
         print("Done.")
         print(f"  Updated:   {updated}")
         print(f"  Not found: {not_found}")
+        print(f"  Errored:   {errored}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
@@ -17,18 +17,31 @@ If no files specified, processes default set:
 - rio_screenings_latest.json
 """
 
+import calendar
+import csv
+import io
 import json
 import os
 import re
 import sys
 import hashlib
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from aliases import resolve_cinema_alias
 
 from dateutil import parser as dtparser
+import psycopg2.errors
+from psycopg2.extras import execute_batch, execute_values
+
+try:
+    import orjson  # optional: C JSON parser, several times faster than json
+except ImportError:
+    orjson = None
 
 from db_helper import (
+    conn_close,
     conn_open,
     norm_space,
     norm_title,
@@ -36,7 +49,7 @@ from db_helper import (
     normalize_person_name,
 )
 
-from ai_cleaning import ai_clean_title_and_tags
+from ai_cleaning import ai_clean_titles_batch
 
 # =========================
 # Config
@@ -47,9 +60,16 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data", "latest")
 # DATA_DIR = os.path.join(PROJECT_ROOT, "data", "test")
 
-LOCAL_TZ = ZoneInfo("America/Vancouver")
+# Stored in stg_screening.tz and hashed into content_hash
+LOCAL_TZ_NAME = "America/Vancouver"
+LOCAL_TZ = ZoneInfo(LOCAL_TZ_NAME)
 UTC = ZoneInfo("UTC")
 
+# Computed once per run; used for the cross-year schedule rule
+_NOW_LOCAL = datetime.now(LOCAL_TZ)
+_CURRENT_LOCAL_MONTH = _NOW_LOCAL.month
+_CURRENT_LOCAL_YEAR = _NOW_LOCAL.year
+
 
 # =========================
 # Small utilities
@@ -88,7 +108,35 @@ def find_latest_files(directory):
     return result
 
 
-def infer_show_year_from_month(date_str: str, base_year: int) -> int:
+# strptime formats tried before dateutil. Yearless ones are parsed with the
+# base year prepended so Feb 29 and Python's yearless-%d warning are handled.
+_YEARLESS_MONTH_FORMATS = ("%Y %a %b %d", "%Y %A %B %d",
+                           "%Y %B %d", "%Y %b %d", "%Y %m/%d")
+_MONTH_FORMATS = ("%B %d %Y", "%b %d %Y", "%Y-%m-%d", "%m/%d/%Y")
+
+
+def _parse_show_month(date_str: str, base_year: int) -> int:
+    d = date_str.strip()
+    for fmt in _YEARLESS_MONTH_FORMATS:
+        try:
+            return datetime.strptime(f"{base_year} {d}", fmt).month
+        except ValueError:
+            continue
+    for fmt in _MONTH_FORMATS:
+        try:
+            return datetime.strptime(d, fmt).month
+        except ValueError:
+            continue
+
+    # Use a dummy default date; we only care about the parsed month.
+    dummy_default = datetime(base_year, 1, 1)
+    return dtparser.parse(d, default=dummy_default, dayfirst=False).month
+
+
+@lru_cache(maxsize=1024)
+def infer_show_year_from_month(
+    date_str: str, base_year: int, current_month: int = _CURRENT_LOCAL_MONTH
+) -> int:
     """
     Given a 'month day' style date_str (without year) and a base_year,
     adjust the year for cross-year schedules.
@@ -97,20 +145,16 @@ def infer_show_year_from_month(date_str: str, base_year: int) -> int:
       - Normally use base_year.
       - But if current month is Oct/Nov/Dec and the show month is Jan–Jun,
         treat it as next year (base_year + 1).
+
+    current_month defaults to the local month when the module was loaded.
+    Cached: feeds repeat the same date string for every showtime that day.
     """
     try:
-        # Use a dummy default date; we only care about the parsed month.
-        dummy_default = datetime(base_year, 1, 1)
-        parsed = dtparser.parse(
-            date_str, default=dummy_default, dayfirst=False)
-        show_month = parsed.month
+        show_month = _parse_show_month(date_str, base_year)
     except Exception:
         # If parsing fails, just fall back to base_year.
         return base_year
 
-    now = datetime.now(LOCAL_TZ)
-    current_month = now.month
-
     year = base_year
     if current_month in (10, 11, 12) and show_month in (1, 2, 3, 4, 5, 6):
         year = base_year + 1
@@ -118,13 +162,17 @@ def infer_show_year_from_month(date_str: str, base_year: int) -> int:
     return year
 
 
+_RUNTIME_MIN_RE = re.compile(r"(\d+)\s*min", re.I)
+_RUNTIME_NUM_RE = re.compile(r"(\d+)")
+
+
 def parse_runtime_minutes(s: str | int | None) -> int | None:
     """Accepts '111 mins', '98 min', '111', None -> int or None."""
     if s is None:
         return None
     if isinstance(s, int):
         return s
-    m = re.search(r"(\d+)\s*min", s, re.I) or re.search(r"(\d+)", s)
+    m = _RUNTIME_MIN_RE.search(s) or _RUNTIME_NUM_RE.search(s)
     return int(m.group(1)) if m else None
 
 
@@ -139,9 +187,28 @@ def parse_year(s: str | int | None) -> int | None:
         return None
 
 
+# LOCAL_TZ offset per calendar day; None for DST-transition days
+_UTC_OFFSET_BY_DATE: dict[date, timedelta | None] = {}
+
+
+def _local_utc_offset(day: date) -> timedelta | None:
+    try:
+        return _UTC_OFFSET_BY_DATE[day]
+    except KeyError:
+        first = datetime.combine(day, time.min, LOCAL_TZ).utcoffset()
+        last = datetime.combine(day, time.max, LOCAL_TZ).utcoffset()
+        offset = first if first == last else None
+        _UTC_OFFSET_BY_DATE[day] = offset
+        return offset
+
+
 def to_utc(local_dt: datetime) -> datetime:
     """Convert localized datetime -> naive UTC (DATETIME in DB)."""
     if local_dt.tzinfo is None:
+        # Fast path: the whole day has one offset, so plain arithmetic works
+        offset = _local_utc_offset(local_dt.date())
+        if offset is not None:
+            return local_dt - offset
         local_dt = local_dt.replace(tzinfo=LOCAL_TZ)
     return local_dt.astimezone(UTC).replace(tzinfo=None)
 
@@ -152,15 +219,12 @@ def guess_end(start_utc: datetime, runtime_min: int | None) -> datetime:
     return start_utc + timedelta(minutes=minutes)
 
 
+_AMPM_RE = re.compile(r"([ap])\.m\.", re.I)
+
+
 def normalize_ampm(s: str) -> str:
-    """Normalize am/pm variants."""
-    return (
-        s.replace("a.m.", "am")
-        .replace("p.m.", "pm")
-        .replace("A.M.", "am")
-        .replace("P.M.", "pm")
-        .strip()
-    )
+    """Normalize am/pm variants ('p.m.', 'P.M.' -> 'pm')."""
+    return _AMPM_RE.sub(lambda m: m.group(1).lower() + "m", s).strip()
 
 
 def is_missing_token(s: str | None) -> bool:
@@ -171,9 +235,13 @@ def is_missing_token(s: str | None) -> bool:
     return t in {"no time", "no date", "tbd", "n/a", "-", ""}
 
 
+# Both hashes below are persisted (screening.source_uid / content_hash) and
+# compared against earlier runs, so the hash function is part of the data:
+# changing it re-keys every live screening. SHA-256 from hashlib is C code
+# and costs far less per row than building the key strings.
 def stable_uid(cinema_id: int, film_id: int, start_at_utc: datetime) -> str:
     """Stable synthetic UID when upstream has no ID."""
-    key = f"{cinema_id}|{film_id}|{start_at_utc:%Y-%m-%d %H:%M:%S}"
+    key = f"{cinema_id}|{film_id}|{start_at_utc.isoformat(' ', 'seconds')}"
     return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
 
 
@@ -191,8 +259,8 @@ def make_content_hash(
     parts = [
         str(film_id),
         str(cinema_id),
-        start_utc.strftime("%Y-%m-%d %H:%M:%S"),
-        end_utc.strftime("%Y-%m-%d %H:%M:%S"),
+        start_utc.isoformat(" ", "seconds"),
+        end_utc.isoformat(" ", "seconds"),
         "" if runtime_min is None else str(runtime_min),
         tz or "",
         source_url or "",
@@ -212,21 +280,23 @@ VALUES (%s, %s, %s)
 ON CONFLICT (name) DO UPDATE
   SET website = EXCLUDED.website,
       address = EXCLUDED.address
+RETURNING id
 """,
     # Requires: film(normalized_title, year) UNIQUE
+    # (execute_values; existing rows are left untouched, not rewritten)
     "film_ins": """
 INSERT INTO film (title, year, description, imdb_id, tmdb_id, normalized_title)
-VALUES (%s, %s, %s, %s, %s, %s)
-ON CONFLICT (normalized_title, year) DO UPDATE
-  SET description = EXCLUDED.description,
-      normalized_title = EXCLUDED.normalized_title
+VALUES %s
+ON CONFLICT (normalized_title, year) DO NOTHING
+RETURNING id, normalized_title, year
 """,
     # Requires: person(normalized_name) UNIQUE
+    # (execute_values; existing rows are left untouched, not rewritten)
     "person_ins": """
 INSERT INTO person (name, imdb_id, tmdb_id, normalized_name)
-VALUES (%s, %s, %s, %s)
-ON CONFLICT (normalized_name) DO UPDATE
-  SET name = EXCLUDED.name
+VALUES %s
+ON CONFLICT (normalized_name) DO NOTHING
+RETURNING normalized_name, id
 """,
     # Requires: film_person(film_id, person_id, role) UNIQUE/PK
     "film_person_ins": """
@@ -234,17 +304,19 @@ INSERT INTO film_person (film_id, person_id, role)
 VALUES (%s, %s, %s)
 ON CONFLICT (film_id, person_id, role) DO NOTHING
 """,
-    "stg_screening_ins": """
-INSERT INTO stg_screening (
+    # Rows are streamed in COPY text format (see copy_text_row)
+    "stg_screening_copy": """
+COPY stg_screening (
     film_id, cinema_id, start_at_utc, end_at_utc, runtime_min, tz,
     source, source_uid, source_url, notes, raw_date, raw_time,
     content_hash, loaded_at_utc, tags
-) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+) FROM STDIN
 """,
-    # Store full raw payload for auditing; cast to jsonb
-    "raw_import_ins": """
-INSERT INTO raw_import (cinema_id, fetched_at, source, payload)
-VALUES (%s, now(), %s, %s::jsonb)
+    # Store full raw payload for auditing. COPY streams the (multi-MB) JSON
+    # without binding it as a statement parameter; fetched_at is sent as
+    # the special input 'now' (transaction start, like now()).
+    "raw_import_copy": """
+COPY raw_import (cinema_id, fetched_at, source, payload) FROM STDIN WITH (FORMAT csv)
 """,
 }
 
@@ -256,23 +328,127 @@ def upsert(cur, sql, params):
     cur.execute(sql, params)
 
 
+_COPY_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text_value(v):
+    if v is None:
+        return "\\N"
+    if isinstance(v, datetime):
+        return v.isoformat(" ")
+    if isinstance(v, list):
+        # text[] literal: every element double-quoted
+        v = "{" + ",".join(
+            '"' + str(x).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for x in v
+        ) + "}"
+    return str(v).translate(_COPY_ESCAPES)
+
+
+def copy_text_row(row):
+    """One tuple -> one line of COPY text format (tab-separated, \\N = NULL)."""
+    return "\t".join(map(_copy_text_value, row)) + "\n"
+
+
 def fetch_one(cur, sql, params):
     """Execute a SQL query and return the first row or None."""
     cur.execute(sql, params)
     return cur.fetchone()
 
 
-def ensure_cinema(cur, cinema_name, cinema_website=None):
-    upsert(cur, SQL["cinema_ins"], (cinema_name, cinema_website, None))
-    row = fetch_one(
-        cur, "SELECT id FROM cinema WHERE name = %s", (cinema_name,))
+def ensure_cinema(cur, cinema_name, cinema_website=None, cache=None):
+    """
+    Upsert a cinema by name and return its id.
+
+    cache, if given, is a {name: id} dict; a cinema already in it is not
+    written again (the first website seen for it in this run wins).
+    """
+    if cache is not None and cinema_name in cache:
+        return cache[cinema_name]
+
+    # DO UPDATE always returns the row, new or existing
+    row = fetch_one(cur, SQL["cinema_ins"], (cinema_name, cinema_website, None))
+    if cache is not None:
+        cache[cinema_name] = row[0]
     return row[0]
 
 
-def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None):
-    """Find or create a film record, using normalized title for deduplication."""
+def prefetch_film_ids(cur, keys):
+    """
+    Resolve many (normalized_title, year) keys to existing film ids in one
+    query. Returns {(normalized_title, year): id} for the keys found.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    cur.execute(
+        """
+        SELECT f.id, k.normalized_title, k.year
+        FROM unnest(%s::text[], %s::int[]) AS k(normalized_title, year)
+        JOIN film f
+          ON f.normalized_title = LOWER(k.normalized_title)
+         AND f.year IS NOT DISTINCT FROM k.year
+        ORDER BY f.id
+        """,
+        ([t for t, _ in keys], [y for _, y in keys]),
+    )
+    found = {}
+    for film_id, normalized, year in cur.fetchall():
+        found.setdefault((normalized, year), film_id)
+    return found
+
+
+def prefetch_person_ids(cur, normalized_names):
+    """Resolve many normalized person names to ids in one query."""
+    names = list(normalized_names)
+    if not names:
+        return {}
+    cur.execute(
+        "SELECT normalized_name, id FROM person WHERE normalized_name = ANY(%s)",
+        (names,),
+    )
+    return dict(cur.fetchall())
+
+
+def insert_films(cur, films):
+    """
+    Insert (title, year, description, imdb, tmdb, normalized_title) rows in
+    one statement; returns {(normalized_title, year): id} for the rows
+    actually inserted.
+    """
+    rows = execute_values(cur, SQL["film_ins"], list(films),
+                          page_size=500, fetch=True)
+    return {(normalized, year): film_id for film_id, normalized, year in rows}
+
+
+def insert_persons(cur, persons):
+    """
+    Insert (name, imdb, tmdb, normalized_name) rows in one statement;
+    returns {normalized_name: id} for the rows actually inserted.
+    """
+    rows = execute_values(cur, SQL["person_ins"], list(persons),
+                          page_size=500, fetch=True)
+    return dict(rows)
+
+
+def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None,
+                cache=None):
+    """
+    Find or create a film record, using normalized title for deduplication.
+
+    cache, if given, is a {(normalized_title, year): id} dict (see
+    prefetch_film_ids) that is consulted first and filled with new ids.
+    """
     normalized = norm_title(title)
 
+    if cache is not None:
+        film_id = cache.get((normalized, year))
+        if film_id is None:
+            film_id = ensure_film(cur, title, year, description, imdb, tmdb)
+            cache[(normalized, year)] = film_id
+        return film_id
+
     # Postgres NULL-safe equality: IS NOT DISTINCT FROM
     row = fetch_one(
         cur,
@@ -282,9 +458,12 @@ def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None):
     if row:
         return row[0]
 
-    upsert(cur, SQL["film_ins"], (title, year,
-           description, imdb, tmdb, normalized))
+    inserted = execute_values(cur, SQL["film_ins"], [(title, year,
+                              description, imdb, tmdb, normalized)], fetch=True)
+    if inserted:
+        return inserted[0][0]
 
+    # lost a race to another writer: DO NOTHING returned no row
     row = fetch_one(
         cur,
         "SELECT id FROM film WHERE normalized_title = LOWER(%s) AND year IS NOT DISTINCT FROM %s",
@@ -294,8 +473,13 @@ def ensure_film(cur, title, year, description=None, imdb=None, tmdb=None):
         return row[0]
 
 
-def ensure_person(cur, name, imdb=None, tmdb=None):
-    """Find or create a person record, using normalized name for deduplication."""
+def ensure_person(cur, name, imdb=None, tmdb=None, cache=None):
+    """
+    Find or create a person record, using normalized name for deduplication.
+
+    cache, if given, is a {normalized_name: id} dict (see
+    prefetch_person_ids) used in place of the name lookup.
+    """
     if not name or not name.strip():
         raise ValueError("Person name cannot be empty")
 
@@ -315,36 +499,102 @@ def ensure_person(cur, name, imdb=None, tmdb=None):
         if row:
             return row[0]
 
+    if cache is not None and normalized in cache:
+        return cache[normalized]
+
     row = fetch_one(
         cur, "SELECT id FROM person WHERE normalized_name = %s", (normalized,))
     if row:
+        if cache is not None:
+            cache[normalized] = row[0]
         return row[0]
 
-    upsert(cur, SQL["person_ins"], (name, imdb, tmdb, normalized))
+    inserted = execute_values(cur, SQL["person_ins"],
+                              [(name, imdb, tmdb, normalized)], fetch=True)
+    if inserted:
+        if cache is not None:
+            cache[normalized] = inserted[0][1]
+        return inserted[0][1]
 
+    # lost a race to another writer: DO NOTHING returned no row
     row = fetch_one(
         cur, "SELECT id FROM person WHERE normalized_name = %s", (normalized,))
     if row:
+        if cache is not None:
+            cache[normalized] = row[0]
         return row[0]
 
     raise RuntimeError(
         f"Could not insert or find person: {name} (normalized: {normalized})")
 
 
-def link_directors(cur, film_id, director_field):
-    """Best-effort to insert director persons and link."""
+# ',', '&', '/' (and ' and ', replaced first) all become one separator
+_DIR_SEP_TABLE = str.maketrans({",": "|", "&": "|", "/": "|"})
+
+
+def split_director_names(director_field):
+    """'Dir. A, B & C' -> ['A', 'B', 'C']"""
     if not director_field:
-        return
+        return []
     cleaned = strip_dir_prefix(director_field)
-    names = re.split(r",|&|/| and ", cleaned)
-    for n in [norm_space(x) for x in names if norm_space(x)]:
-        pid = ensure_person(cur, n)
-        upsert(cur, SQL["film_person_ins"], (film_id, pid, "director"))
+    names = cleaned.replace(" and ", "|").translate(_DIR_SEP_TABLE).split("|")
+    return [n for n in map(norm_space, names) if n]
+
+
+def link_directors(cur, film_id, director_field, person_cache=None):
+    """Best-effort to insert director persons and link."""
+    links = [
+        (film_id, ensure_person(cur, n, cache=person_cache), "director")
+        for n in split_director_names(director_field)
+    ]
+    # one round-trip per page instead of per link
+    execute_batch(cur, SQL["film_person_ins"], links, page_size=500)
 
 
 # =========================
 # Source-specific datetime parsers
 # =========================
+_MONTHS = {
+    name.lower(): i
+    for i in range(1, 13)
+    for name in (calendar.month_name[i], calendar.month_abbr[i])
+}
+_MONTHS["sept"] = 9
+_DATE_TOKEN_RE = re.compile(r"[a-z]+|\d+", re.I)
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{2})\s*([ap]m)?", re.I)
+
+
+def _parse_dt_tokens(date_str: str, time_str: str, year: int | None = None) -> datetime | None:
+    """
+    Pick the month name, the day, an optional 4-digit year and an
+    h:mm[am|pm] time out of the strings, without strptime (month names
+    come from _MONTHS). Cinematheque's main parser and the fallback for
+    drifted formats elsewhere. Returns None if any part is missing, so
+    the caller can use dateutil.
+    """
+    month = day = None
+    for tok in _DATE_TOKEN_RE.findall(date_str):
+        if tok.isdigit():
+            if len(tok) == 4:
+                year = int(tok)
+            elif day is None and len(tok) <= 2:
+                day = int(tok)
+        elif month is None:
+            month = _MONTHS.get(tok.lower())
+    clock = _CLOCK_RE.search(time_str)
+    if month is None or day is None or year is None or clock is None:
+        return None
+
+    hour, minute = int(clock.group(1)), int(clock.group(2))
+    ampm = (clock.group(3) or "").lower()
+    if ampm:
+        hour = hour % 12 + (12 if ampm == "pm" else 0)
+    try:
+        return datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+
 def parse_dt_cinematheque(date_str: str, time_str: str) -> datetime:
     """
     Cinematheque examples:
@@ -354,13 +604,8 @@ def parse_dt_cinematheque(date_str: str, time_str: str) -> datetime:
     t = normalize_ampm(time_str)
     d = (date_str or "").strip()
 
-    for fmt in ("%Y-%B-%d %I:%M %p", "%Y-%b-%d %I:%M %p"):
-        try:
-            return datetime.strptime(f"{d} {t}", fmt)
-        except ValueError:
-            pass
-
-    return dtparser.parse(f"{d} {t}")
+    # Year, month name and day are all in the date, so no strptime needed
+    return _parse_dt_tokens(d, t) or dtparser.parse(f"{d} {t}")
 
 
 def parse_dt_viff(date_str: str, time_str: str, year_hint: int | None) -> datetime:
@@ -375,8 +620,7 @@ def parse_dt_viff(date_str: str, time_str: str, year_hint: int | None) -> dateti
     t = normalize_ampm(time_str)
 
     # Fall back to current local year if no hint is given.
-    base_year = year_hint if year_hint is not None else datetime.now(
-        LOCAL_TZ).year
+    base_year = year_hint if year_hint is not None else _CURRENT_LOCAL_YEAR
     year_for_show = infer_show_year_from_month(date_str, base_year)
 
     try:
@@ -386,8 +630,8 @@ def parse_dt_viff(date_str: str, time_str: str, year_hint: int | None) -> dateti
             "%a %b %d %Y %I:%M %p",
         )
     except ValueError:
-        # Fallback to dateutil if the format changes.
-        return dtparser.parse(
+        # Fallback if the format changes: token scan, then dateutil.
+        return _parse_dt_tokens(date_str, t, year_for_show) or dtparser.parse(
             f"{date_str} {year_for_show} {t}",
             dayfirst=False,
         )
@@ -404,8 +648,7 @@ def parse_dt_rio(date_str: str, time_str: str, year_hint: int | None) -> datetim
     # Rio times often look like '7:00pm' (no space before am/pm).
     t = normalize_ampm(time_str).replace(" ", "")
 
-    base_year = year_hint if year_hint is not None else datetime.now(
-        LOCAL_TZ).year
+    base_year = year_hint if year_hint is not None else _CURRENT_LOCAL_YEAR
     year_for_show = infer_show_year_from_month(date_str, base_year)
 
     try:
@@ -415,8 +658,8 @@ def parse_dt_rio(date_str: str, time_str: str, year_hint: int | None) -> datetim
             "%A %B %d %Y %I:%M%p",
         )
     except ValueError:
-        # Fallback if Rio changes the text format.
-        return dtparser.parse(
+        # Fallback if Rio changes the text format: token scan, then dateutil.
+        return _parse_dt_tokens(date_str, t, year_for_show) or dtparser.parse(
             f"{date_str} {year_for_show} {t}",
             dayfirst=False,
         )
@@ -438,31 +681,50 @@ def load_source(
     For this source, we accept a default (cinema_name, cinema_website),
     but for each showtime we prefer the exact cinema name scraped as st['venue'].
     """
-    with open(path, "r", encoding="utf-8") as f:
-        rows = json.load(f)
+    with open(path, "rb") as f:
+        data = f.read()
+    rows = orjson.loads(data) if orjson is not None else json.loads(data)
 
     # Audit record (one per source run)
-    default_cid = ensure_cinema(cur, cinema_name, cinema_website)
-    upsert(
-        cur,
-        SQL["raw_import_ins"],
-        (default_cid, source_name, json.dumps(rows, ensure_ascii=False)),
-    )
+    # cinema ids of this file by exact name; venues repeat on every showtime
+    cinema_ids = {}
+    default_cid = ensure_cinema(cur, cinema_name, cinema_website,
+                                cache=cinema_ids)
+    # the file text is already valid JSON; store it as-is, no re-serialize
+    buf = io.StringIO()
+    csv.writer(buf).writerow(
+        (default_cid, "now", source_name, data.decode("utf-8-sig")))
+    buf.seek(0)
+    cur.copy_expert(SQL["raw_import_copy"], buf)
 
     loaded_at_utc = datetime.now(UTC).replace(tzinfo=None)
 
     # Clear staging for this source
     cur.execute("DELETE FROM stg_screening WHERE source = %s", (source_name,))
 
-    def eq_ci(a: str | None, b: str | None) -> bool:
-        return (a or "").strip().lower() == (b or "").strip().lower()
+    default_name_lower = (cinema_name or "").strip().lower()
+
+    # cinema id per scraped venue string (alias resolution included)
+    venue_cids = {}
+
+    # --- AI: clean every distinct title of this file concurrently up front ---
+    titles = list(dict.fromkeys(r.get("title") or "" for r in rows))
+    cleaned_by_title = dict(zip(titles, ai_clean_titles_batch(titles)))
+
+    # staging rows are streamed with one COPY after the loop
+    stg_rows = []
+
+    # (row, raw_title, clean_title, base_screening_tags) per input row
+    prepared = []
 
     for r in rows:
         raw_title = r.get("title") or ""
 
         # --- AI: normalize title + extract screening-level tags from title ---
         try:
-            cleaned = ai_clean_title_and_tags(raw_title)
+            cleaned = cleaned_by_title[raw_title]
+            if isinstance(cleaned, Exception):
+                raise cleaned
             clean_title = cleaned.get("normalized_title") or raw_title
             base_screening_tags = cleaned.get("screening_tags") or []
             base_screening_tags = [
@@ -474,27 +736,75 @@ def load_source(
             clean_title = raw_title
             base_screening_tags = []
 
+        prepared.append((r, raw_title, clean_title, base_screening_tags))
+
+    # Resolve every existing film and director of this file in two queries;
+    # anything still unresolved below falls back to per-row find-or-create.
+    film_ids = prefetch_film_ids(cur, {
+        (norm_title(clean_title), parse_year(r.get("year")))
+        for r, _, clean_title, _ in prepared
+    })
+    person_ids = prefetch_person_ids(cur, {
+        normalize_person_name(n)
+        for r, _, _, _ in prepared
+        for n in split_director_names(r.get("director"))
+    } - {""})
+
+    # Insert each missing film / director exactly once (first occurrence
+    # wins), in one statement each.
+    new_films = {}
+    new_persons = {}
+    for r, _, clean_title, _ in prepared:
+        key = (norm_title(clean_title), parse_year(r.get("year")))
+        if key not in film_ids and key not in new_films:
+            new_films[key] = (clean_title, key[1], r.get("description"),
+                              None, None, key[0])
+        for n in split_director_names(r.get("director")):
+            normalized = normalize_person_name(n)
+            if normalized and normalized not in person_ids:
+                new_persons.setdefault(normalized, (n, None, None, normalized))
+    # Sorted so concurrent loads (see load_file) take row locks in the
+    # same order and cannot deadlock on each other's new films / people.
+    if new_films:
+        film_ids.update(insert_films(cur, (
+            v for _, v in sorted(new_films.items(),
+                                 key=lambda kv: (kv[0][0], kv[0][1] or 0))
+        )))
+    if new_persons:
+        person_ids.update(insert_persons(
+            cur, (v for _, v in sorted(new_persons.items()))))
+
+    for r, raw_title, clean_title, base_screening_tags in prepared:
         year = parse_year(r.get("year"))
         runtime = parse_runtime_minutes(r.get("duration"))
 
         # Use cleaned title when upserting film
-        film_id = ensure_film(cur, clean_title, year, r.get("description"))
-        link_directors(cur, film_id, r.get("director"))
+        film_id = ensure_film(cur, clean_title, year, r.get("description"),
+                              cache=film_ids)
+        link_directors(cur, film_id, r.get("director"), person_cache=person_ids)
+
+        detail_url = r.get("detail_url")
 
         for st in r.get("showtimes", []):
+            raw_date = st.get("date")
+            raw_time = st.get("time")
             scraped_cinema = (st.get("venue") or "").strip()
             candidate_name = scraped_cinema or cinema_name
 
-            canonical = resolve_cinema_alias(source_name, candidate_name)
-            resolved_name = canonical or candidate_name
+            cid = venue_cids.get(candidate_name)
+            if cid is None:
+                canonical = resolve_cinema_alias(source_name, candidate_name)
+                resolved_name = canonical or candidate_name
 
-            same_as_default = eq_ci(resolved_name, cinema_name)
-            this_cinema_site = cinema_website if same_as_default else None
+                same_as_default = resolved_name.strip().lower() == default_name_lower
+                this_cinema_site = cinema_website if same_as_default else None
 
-            cid = ensure_cinema(cur, resolved_name, this_cinema_site)
+                cid = ensure_cinema(cur, resolved_name, this_cinema_site,
+                                    cache=cinema_ids)
+                venue_cids[candidate_name] = cid
 
-            date_str = (st.get("date") or "").strip()
-            time_str = (st.get("time") or "").strip()
+            date_str = (raw_date or "").strip()
+            time_str = (raw_time or "").strip()
             if is_missing_token(date_str) or is_missing_token(time_str):
                 print(
                     f"[SKIP] {source_name}: '{raw_title}' missing time/date → "
@@ -521,36 +831,38 @@ def load_source(
                 start_utc,
                 end_utc,
                 runtime,
-                "America/Vancouver",
-                r.get("detail_url"),
+                LOCAL_TZ_NAME,
+                detail_url,
                 None,
             )
 
             # Clone base tags so we could later add per-showtime tags if needed
             screening_tags = list(base_screening_tags)
 
-            upsert(
-                cur,
-                SQL["stg_screening_ins"],
+            stg_rows.append(
                 (
                     film_id,
                     cid,
                     start_utc,
                     end_utc,
                     runtime,
-                    "America/Vancouver",
+                    LOCAL_TZ_NAME,
                     source_name,
                     source_uid,
-                    r.get("detail_url"),
+                    detail_url,
                     None,           # notes
-                    st.get("date"),
-                    st.get("time"),
+                    raw_date,
+                    raw_time,
                     content_hash,
                     loaded_at_utc,
                     screening_tags,  # <-- tags: text[] column
-                ),
+                )
             )
 
+    # COPY skips per-row SQL parsing entirely
+    cur.copy_expert(SQL["stg_screening_copy"],
+                    io.StringIO("".join(map(copy_text_row, stg_rows))))
+
 
 # =========================
 # Source wrappers
@@ -574,7 +886,7 @@ def load_viff(cur, path):
         "VIFF Centre",
         "https://viff.org",
         parse_dt_viff,
-        datetime.now(LOCAL_TZ).year,
+        _CURRENT_LOCAL_YEAR,
     )
 
 
@@ -586,10 +898,68 @@ def load_rio(cur, path):
         "Rio Theatre",
         "https://riotheatre.ca",
         parse_dt_rio,
-        datetime.now(LOCAL_TZ).year,
+        _CURRENT_LOCAL_YEAR,
     )
 
 
+def source_of(fp):
+    """Source key of an input file, from its name ('viff', ...), or None."""
+    name = os.path.basename(fp).lower()
+    for source in ("cinematheque", "viff", "rio"):
+        if source in name:
+            return source
+    return None
+
+
+def load_file(fp):
+    """
+    Load one input file into staging on its own pooled connection and
+    commit it. Each load replaces its source's staging rows, so files of
+    the same source must not run at the same time (see load_source_files).
+    """
+    loader = {
+        "cinematheque": load_cinematheque,
+        "viff": load_viff,
+        "rio": load_rio,
+    }.get(source_of(fp))
+    if loader is None:
+        print(f"[SKIP] Unrecognized file: {fp}")
+        return
+
+    conn = conn_open()
+    try:
+        for attempt in (1, 2):
+            try:
+                # commits on success, rolls back on error
+                with conn:
+                    with conn.cursor() as cur:
+                        loader(cur, fp)
+                return
+            except psycopg2.errors.DeadlockDetected:
+                # Shared venues can still be upserted in different orders;
+                # the load starts by clearing its own staging rows, so a
+                # second attempt is safe.
+                if attempt == 2:
+                    raise
+                print(f"[RETRY] deadlock while loading {fp}", file=sys.stderr)
+    finally:
+        conn_close(conn)
+
+
+def load_source_files(fps):
+    """
+    Load one source's files one after another, in the given order.
+    Returns [(fp, error)] for the files that failed.
+    """
+    failed = []
+    for fp in fps:
+        try:
+            load_file(fp)
+        except Exception as e:
+            failed.append((fp, e))
+    return failed
+
+
 # =========================
 # Main
 # =========================
@@ -626,24 +996,29 @@ def main():
     for f in files:
         print(f"  {f}")
 
-    # 4. Open DB connection and load each file into staging
-    conn = conn_open()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                for fp in files:
-                    name = os.path.basename(fp).lower()
-                    if "cinematheque" in name:
-                        load_cinematheque(cur, fp)
-                    elif "viff" in name:
-                        load_viff(cur, fp)
-                    elif "rio" in name:
-                        load_rio(cur, fp)
-                    else:
-                        print(f"[SKIP] Unrecognized file: {fp}")
-        print("✅ Staging load complete. Run merge SQL to promote to live screening table.")
-    finally:
-        conn.close()
+    # 4. Load the files into staging, one transaction each. Sources run
+    #    concurrently; files of the same source (e.g. a re-scrape next to
+    #    the old one) both write that source's staging rows, so they run
+    #    serially, in command-line order.
+    by_source = {}
+    for fp in files:
+        by_source.setdefault(source_of(fp), []).append(fp)
+
+    with ThreadPoolExecutor(max_workers=len(by_source)) as ex:
+        futures = [ex.submit(load_source_files, fps)
+                   for fps in by_source.values()]
+
+    failed = []
+    for fut in futures:
+        for fp, e in fut.result():
+            print(f"[ERROR] {fp}: {e}", file=sys.stderr)
+            failed.append(fp)
+    if failed:
+        print(f"Error: {len(failed)} file(s) failed to load; "
+              "their staging rows were left unchanged.", file=sys.stderr)
+        sys.exit(1)
+
+    print("✅ Staging load complete. Run merge SQL to promote to live screening table.")
 
 
 if __name__ == "__main__":
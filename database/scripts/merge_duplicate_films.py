@@ -25,7 +25,7 @@ Strategy (high-level):
   4) Delete the merged-away film rows.
 
 Usage:
-    python scripts/merge_duplicate_films.py [--dry-run]
+    python scripts/merge_duplicate_films.py [--dry-run] [--batch-size N] [--workers N]
 
 Notes:
   - This script is explicitly aware of all tables that reference film.id:
@@ -39,32 +39,69 @@ Notes:
       * There is a UNIQUE constraint on (cinema_id, film_id, start_at_utc).
         When re-pointing screenings from a loser film_id to the kept one,
         we may create duplicates that violate this unique constraint.
-        To avoid this, we proactively delete exact-duplicate screenings
-        before updating the film_id.
+        To avoid this, only screenings whose slot is still free are moved,
+        and the exact duplicates left on the losers are deleted.
 
   - For film_person:
       * The primary key is (film_id, person_id, role).
         We use INSERT ... ON CONFLICT DO NOTHING to deduplicate rows when
         merging references into the kept film, then delete leftover rows
         for the losers.
+
+  - Large groups:
+      * When a group has more than --batch-size references of one kind,
+        they are moved in batches of that size, committing after each
+        batch, so no single statement holds locks on (or writes WAL for)
+        tens of thousands of rows. Each batch leaves the data consistent;
+        an interrupted run only has part of the references already on the
+        kept film, and re-running finishes the merge.
+
+  - Concurrency:
+      * Groups are merged by --workers threads, each on its own pooled
+        connection, and each group is committed on its own. If one group
+        fails, the groups already merged stay merged and the run exits
+        with an error; re-running picks up the rest.
 """
 
+import argparse
 import sys
-from typing import List, Tuple, Dict, Any
-from db_helper import conn_open
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple, Dict, Any
+from db_helper import (
+    DB_POOL_MAX,
+    conn_close,
+    conn_open,
+    prepare_merge_film_group,
+)
+
+# Default for --batch-size: max rows per statement when moving references
+DEFAULT_BATCH_SIZE = 10000
+
+# Default for --workers: groups merged concurrently, one pooled connection each
+DEFAULT_WORKERS = 4
 
 
 # ---------------------------------------------------------------------------
 # Duplicate group discovery
 # ---------------------------------------------------------------------------
 
-def find_film_duplicates_by_field(conn, field: str) -> List[Tuple[Any, List[int]]]:
+def find_film_duplicates_by_field(
+    conn, field: str, skip_merged: bool = False, itersize: int = 1000
+) -> Iterator[Tuple[Any, List[int]]]:
     """
-    Return a list of (field_value, [film_ids]) where field_value is duplicated.
+    Yield (field_value, [film_ids]) for every field_value that is duplicated.
+
+    Groups are streamed from a server-side cursor, `itersize` at a time.
+    The cursor lives in the current transaction, so the caller must not
+    commit on this connection until it has finished iterating (merges run
+    and commit on their own connections, see merge_group_on_own_connection).
 
     field must be one of:
       - 'imdb_id' (text)
       - 'tmdb_id' (int)
+
+    skip_merged: leave out films recorded in the _merged_film temp table
+    (see create_merged_film_table), i.e. already handled in an earlier step.
     """
 
     if field not in {"imdb_id", "tmdb_id"}:
@@ -77,6 +114,9 @@ def find_film_duplicates_by_field(conn, field: str) -> List[Tuple[Any, List[int]
         # TEXT: exclude empty strings too
         where_nonempty = f"{field} IS NOT NULL AND {field} <> ''"
 
+    if skip_merged:
+        where_nonempty += " AND id NOT IN (SELECT id FROM _merged_film)"
+
     sql = f"""
         SELECT {field},
                array_agg(id ORDER BY id) AS ids,
@@ -88,167 +128,172 @@ def find_film_duplicates_by_field(conn, field: str) -> List[Tuple[Any, List[int]
         ORDER BY cnt DESC
     """
 
-    with conn.cursor() as cur:
+    with conn.cursor(name=f"film_dupes_{field}") as cur:
+        cur.itersize = itersize
         cur.execute(sql)
-        rows = cur.fetchall()
-
-    out: List[Tuple[Any, List[int]]] = []
-    for field_value, ids_array, cnt in rows:
-        out.append((field_value, [int(x) for x in ids_array]))
-    return out
-
+        for field_value, ids_array, cnt in cur:
+            yield field_value, [int(x) for x in ids_array]
 
-# ---------------------------------------------------------------------------
-# Film details / reference counts
-# ---------------------------------------------------------------------------
 
-def get_film_details(conn, film_id: int) -> Dict[str, Any]:
+def create_merged_film_table(conn) -> None:
     """
-    Fetch core details for a film. If not found, returns {}.
+    Create (or empty) the session temp table _merged_film, which records
+    the ids of every group already processed so later steps skip them.
+    Kept across commits; emptied here because pooled connections (and so
+    their temp tables) are reused by later runs.
     """
+    with conn.cursor() as cur:
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _merged_film (id int PRIMARY KEY)")
+        cur.execute("TRUNCATE _merged_film")
+
+
+def record_merged_films(conn, film_ids: List[int]) -> None:
     with conn.cursor() as cur:
         cur.execute(
             """
-            SELECT id,
-                   title,
-                   year,
-                   rated,
-                   genre,
-                   language,
-                   country,
-                   awards,
-                   rt_rating_pct,
-                   imdb_rating,
-                   imdb_votes,
-                   description,
-                   normalized_title,
-                   imdb_id,
-                   tmdb_id,
-                   imdb_url,
-                   tags,
-                   created_at
-            FROM film
-            WHERE id = %s
+            INSERT INTO _merged_film (id)
+            SELECT unnest(%s::int[])
+            ON CONFLICT DO NOTHING
             """,
-            (film_id,),
+            (film_ids,),
         )
-        row = cur.fetchone()
 
-    if not row:
-        return {}
 
-    return {
-        "id": row[0],
-        "title": row[1],
-        "year": row[2],
-        "rated": row[3],
-        "genre": row[4],
-        "language": row[5],
-        "country": row[6],
-        "awards": row[7],
-        "rt_rating_pct": row[8],
-        "imdb_rating": row[9],
-        "imdb_votes": row[10],
-        "description": row[11],
-        "normalized_title": row[12],
-        "imdb_id": row[13],
-        "tmdb_id": row[14],
-        "imdb_url": row[15],
-        "tags": row[16],
-        "created_at": row[17],
-    }
-
-
-def count_film_references(conn, film_id: int) -> Dict[str, int]:
+# ---------------------------------------------------------------------------
+# Film details / reference counts
+# ---------------------------------------------------------------------------
+
+# Film columns loaded for scoring / logging, in SELECT order
+FILM_DETAIL_COLUMNS = (
+    "id",
+    "title",
+    "year",
+    "rated",
+    "genre",
+    "language",
+    "country",
+    "awards",
+    "rt_rating_pct",
+    "imdb_rating",
+    "imdb_votes",
+    "description",
+    "normalized_title",
+    "imdb_id",
+    "tmdb_id",
+    "imdb_url",
+    "tags",
+    "created_at",
+)
+_FILM_SELECT_LIST = ", ".join(f"f.{c}" for c in FILM_DETAIL_COLUMNS)
+
+
+# Details + the three reference counts; callers append a WHERE clause
+_FILMS_WITH_COUNTS_SQL = f"""
+    SELECT {_FILM_SELECT_LIST},
+           (SELECT COUNT(*) FROM screening s WHERE s.film_id = f.id),
+           (SELECT COUNT(*) FROM stg_screening s WHERE s.film_id = f.id),
+           (SELECT COUNT(*) FROM film_person fp WHERE fp.film_id = f.id)
+    FROM film f
+"""
+
+
+def _fetch_films_with_counts(conn, where: str, params=()) -> Dict[int, Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute(_FILMS_WITH_COUNTS_SQL + where, params)
+        rows = cur.fetchall()
+
+    n = len(FILM_DETAIL_COLUMNS)
+    out: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        details = dict(zip(FILM_DETAIL_COLUMNS, row[:n]))
+        screening_count, stg_count, fp_count = row[n:]
+        details["ref_counts"] = {
+            "screening_count": screening_count,
+            "stg_screening_count": stg_count,
+            "film_person_count": fp_count,
+            "total": screening_count + stg_count + fp_count,
+        }
+        out[details["id"]] = details
+    return out
+
+
+def get_films_with_counts(conn, film_ids: List[int]) -> Dict[int, Dict[str, Any]]:
     """
-    Count how many references a film has across key tables.
+    Fetch details plus reference counts for many films in one query.
 
-    Returns a dict with keys:
-      - screening_count
-      - stg_screening_count
-      - film_person_count
-      - total (sum of the above)
+    Returns {film_id: details} where each details dict also carries
+    "ref_counts": screening_count, stg_screening_count, film_person_count
+    and their total. Films that no longer exist are simply absent.
     """
-    with conn.cursor() as cur:
-        cur.execute(
-            "SELECT COUNT(*) FROM screening WHERE film_id = %s",
-            (film_id,),
-        )
-        screening_count = cur.fetchone()[0]
+    if not film_ids:
+        return {}
+    return _fetch_films_with_counts(conn, "WHERE f.id = ANY(%s)", (list(film_ids),))
 
-        cur.execute(
-            "SELECT COUNT(*) FROM stg_screening WHERE film_id = %s",
-            (film_id,),
-        )
-        stg_count = cur.fetchone()[0]
 
-        cur.execute(
-            "SELECT COUNT(*) FROM film_person WHERE film_id = %s",
-            (film_id,),
-        )
-        fp_count = cur.fetchone()[0]
+def load_duplicate_candidates(conn) -> Dict[int, Dict[str, Any]]:
+    """
+    Up-front scan: details + reference counts for every film that shares
+    its imdb_id or tmdb_id with another film, as {film_id: details}.
 
-    total = screening_count + stg_count + fp_count
-    return {
-        "screening_count": screening_count,
-        "stg_screening_count": stg_count,
-        "film_person_count": fp_count,
-        "total": total,
-    }
+    Scoring and merge logging read from this dict instead of querying per
+    film. It stays accurate for the whole run: a film's counts only change
+    once its group is merged, and main skips every film of a merged group
+    (keeper included) via seen_ids.
+    """
+    return _fetch_films_with_counts(
+        conn,
+        """
+        WHERE f.imdb_id IN (
+                SELECT imdb_id FROM film
+                WHERE imdb_id IS NOT NULL AND imdb_id <> ''
+                GROUP BY imdb_id HAVING COUNT(*) > 1)
+           OR f.tmdb_id IN (
+                SELECT tmdb_id FROM film
+                WHERE tmdb_id IS NOT NULL
+                GROUP BY tmdb_id HAVING COUNT(*) > 1)
+        """,
+    )
 
 
 # ---------------------------------------------------------------------------
 # Scoring: choose canonical film per duplicate group
 # ---------------------------------------------------------------------------
 
+# Fields counted by metadata_score when not None (0 is a real value)
+_METADATA_NOT_NULL_FIELDS = ("year", "rt_rating_pct", "imdb_rating", "imdb_votes")
+# Fields counted when truthy (non-empty text)
+_METADATA_TRUTHY_FIELDS = (
+    "rated",
+    "genre",
+    "language",
+    "country",
+    "awards",
+    "description",
+    "normalized_title",
+    "imdb_url",
+)
+
+
 def metadata_score(rec: Dict[str, Any]) -> int:
     """
     Rough measure of how much metadata is filled in for this film.
     This is intentionally simple; you can adjust fields/weights later.
     """
-    score = 0
-
-    # Basic numeric / text fields
-    if rec.get("year") is not None:
-        score += 1
-    if rec.get("rated"):
-        score += 1
-    if rec.get("genre"):
-        score += 1
-    if rec.get("language"):
-        score += 1
-    if rec.get("country"):
-        score += 1
-    if rec.get("awards"):
-        score += 1
-
-    # Ratings / votes
-    if rec.get("rt_rating_pct") is not None:
-        score += 1
-    if rec.get("imdb_rating") is not None:
-        score += 1
-    if rec.get("imdb_votes") is not None:
-        score += 1
-
-    # Richer text fields
-    if rec.get("description"):
-        score += 1
-    if rec.get("normalized_title"):
-        score += 1
-
-    # External URL
-    if rec.get("imdb_url"):
-        score += 1
-
-    # Tags
-    tags = rec.get("tags") or []
-    if isinstance(tags, (list, tuple)) and len(tags) > 0:
-        score += 1
-
-    return score
-
-
-def choose_best_film_record(conn, film_ids: List[int]) -> int:
+    get = rec.get
+    tags = get("tags")
+    return (
+        sum(get(f) is not None for f in _METADATA_NOT_NULL_FIELDS)
+        + sum(map(bool, map(get, _METADATA_TRUTHY_FIELDS)))
+        + (isinstance(tags, (list, tuple)) and len(tags) > 0)
+    )
+
+
+def choose_best_film_record(
+    conn,
+    film_ids: List[int],
+    details: Optional[Dict[int, Dict[str, Any]]] = None,
+) -> int:
     """
     Choose the best film record to keep from a group of duplicate IDs.
 
@@ -258,17 +303,16 @@ def choose_best_film_record(conn, film_ids: List[int]) -> int:
       3) More references (screening + stg_screening + film_person) is better
       4) Earlier created_at is better
       5) Smaller id is better (as final tiebreaker)
+
+    details: optional {film_id: details-with-counts} (see
+    load_duplicate_candidates); fetched in one query when not given.
     """
+    if details is None:
+        details = get_films_with_counts(conn, film_ids)
 
-    records: List[Dict[str, Any]] = []
-    for fid in film_ids:
-        details = get_film_details(conn, fid)
-        # If a film was already deleted earlier in this run, skip it
-        if not details:
-            continue
-        ref_counts = count_film_references(conn, fid)
-        details["ref_counts"] = ref_counts
-        records.append(details)
+    # films already deleted earlier in this run are simply missing
+    records: List[Dict[str, Any]] = [
+        details[fid] for fid in film_ids if fid in details]
 
     if not records:
         # Fallback: if everything is gone (should not usually happen),
@@ -290,7 +334,7 @@ def choose_best_film_record(conn, film_ids: List[int]) -> int:
             -rec["id"],  # smaller id is better (reverse for descending)
         )
 
-    best = sorted(records, key=score, reverse=True)[0]
+    best = max(records, key=score)
     return best["id"]
 
 
@@ -298,24 +342,144 @@ def choose_best_film_record(conn, film_ids: List[int]) -> int:
 # Merge logic for a duplicate group
 # ---------------------------------------------------------------------------
 
-def merge_film_group(conn, keep_id: int, merge_ids: List[int], dry_run: bool = False) -> None:
+# One batch per statement; each returns how many loser rows it handled, so
+# the loop stops on a short batch. Screening rows are taken in id order so
+# the smallest-id row of a slot is moved before its duplicates are seen.
+_BATCH_MOVE_SQL = (
+    (
+        "screening",
+        """
+        WITH b AS (
+            SELECT s.id,
+                   EXISTS (
+                       SELECT 1
+                       FROM screening k
+                       WHERE k.cinema_id = s.cinema_id
+                         AND k.start_at_utc = s.start_at_utc
+                         AND (k.film_id = %(keep)s
+                              OR (k.film_id = ANY(%(losers)s) AND k.id < s.id))
+                   ) AS taken
+            FROM screening s
+            WHERE s.film_id = ANY(%(losers)s)
+            ORDER BY s.id
+            LIMIT %(n)s
+        ),
+        del AS (
+            DELETE FROM screening
+            WHERE id IN (SELECT id FROM b WHERE taken)
+            RETURNING 1
+        ),
+        upd AS (
+            UPDATE screening
+            SET film_id = %(keep)s
+            WHERE id IN (SELECT id FROM b WHERE NOT taken)
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM del) + (SELECT COUNT(*) FROM upd)
+        """,
+    ),
+    (
+        "stg_screening",
+        """
+        WITH upd AS (
+            UPDATE stg_screening
+            SET film_id = %(keep)s
+            WHERE (source, source_uid) IN (
+                SELECT source, source_uid
+                FROM stg_screening
+                WHERE film_id = ANY(%(losers)s)
+                LIMIT %(n)s
+            )
+            RETURNING 1
+        )
+        SELECT COUNT(*) FROM upd
+        """,
+    ),
+    (
+        "film_person",
+        """
+        WITH b AS (
+            SELECT film_id, person_id, role
+            FROM film_person
+            WHERE film_id = ANY(%(losers)s)
+            LIMIT %(n)s
+        ),
+        ins AS (
+            INSERT INTO film_person (film_id, person_id, role)
+            SELECT %(keep)s, person_id, role
+            FROM b
+            ON CONFLICT (film_id, person_id, role) DO NOTHING
+        ),
+        del AS (
+            DELETE FROM film_person fp
+            USING b
+            WHERE fp.film_id = b.film_id
+              AND fp.person_id = b.person_id
+              AND fp.role = b.role
+            RETURNING 1
+        )
+        SELECT COUNT(*) FROM del
+        """,
+    ),
+)
+
+
+def move_references_in_batches(
+    conn, keep_id: int, losers: List[int], batch_size: int
+) -> None:
+    """
+    Move the losers' screening / stg_screening / film_person rows to keep_id
+    at most batch_size rows per statement, committing after each batch.
+    Same rules as the one-statement merge (duplicate slots are deleted,
+    film_person deduplicated); the film rows themselves are left for it.
+    """
+    params = {"keep": keep_id, "losers": losers, "n": batch_size}
+    with conn.cursor() as cur:
+        for table, sql in _BATCH_MOVE_SQL:
+            moved = 0
+            while True:
+                cur.execute(sql, params)
+                done = cur.fetchone()[0]
+                conn.commit()
+                moved += done
+                if done < batch_size:
+                    break
+            print(f"  Moved {moved} {table} rows in batches of {batch_size}")
+
+
+def merge_film_group(
+    conn,
+    keep_id: int,
+    merge_ids: List[int],
+    dry_run: bool = False,
+    details: Optional[Dict[int, Dict[str, Any]]] = None,
+    batch_size: Optional[int] = None,
+) -> None:
     """
     Merge a group of duplicate films into a single kept film (keep_id).
 
     Steps:
       1) Log summary of what will be merged.
-      2) For each losing film_id in merge_ids:
-           - log counts and details
-           - if not dry-run:
-               * move screening references, deduplicating potential conflicts
-               * move stg_screening references
-               * move film_person references with ON CONFLICT DO NOTHING
-               * delete the losing film row
+      2) Log counts and details for each losing film_id in merge_ids.
+      3) If not dry-run, in one statement for all losers at once:
+           * move screening references, deduplicating potential conflicts
+           * move stg_screening references
+           * move film_person references with ON CONFLICT DO NOTHING
+           * delete the losing film rows
+
+    details: optional {film_id: details-with-counts} covering the group
+    (see load_duplicate_candidates); fetched in one query when not given.
+
+    batch_size: if the losers have more references of one kind than this,
+    they are first moved in committed batches (move_references_in_batches).
     """
     if not merge_ids:
         return
 
-    keep_details = get_film_details(conn, keep_id)
+    if details is None:
+        details = get_films_with_counts(conn, [keep_id] + merge_ids)
+
+    keep_details = details.get(keep_id)
     if not keep_details:
         prefix = "[DRY RUN] " if dry_run else ""
         print(f"{prefix}WARNING: keep_id={keep_id} not found; skipping group.")
@@ -331,12 +495,12 @@ def merge_film_group(conn, keep_id: int, merge_ids: List[int], dry_run: bool = F
     total_refs = 0
 
     for mid in merge_ids:
-        merge_details = get_film_details(conn, mid)
+        merge_details = details.get(mid)
         if not merge_details:
             print(f"  {prefix}Film ID {mid} already missing; skipping.")
             continue
 
-        ref_counts = count_film_references(conn, mid)
+        ref_counts = merge_details["ref_counts"]
         total_refs += ref_counts["total"]
 
         print(
@@ -351,58 +515,46 @@ def merge_film_group(conn, keep_id: int, merge_ids: List[int], dry_run: bool = F
     if dry_run:
         return
 
-    with conn.cursor() as cur:
-        for mid in merge_ids:
-            merge_details = get_film_details(conn, mid)
-            if not merge_details:
-                # Already deleted or not found
-                continue
-
-            # 1) Handle screening: avoid violating UNIQUE (cinema_id, film_id, start_at_utc)
-            cur.execute(
-                """
-                DELETE FROM screening s
-                USING screening k
-                WHERE s.film_id = %s
-                  AND k.film_id = %s
-                  AND s.cinema_id = k.cinema_id
-                  AND s.start_at_utc = k.start_at_utc
-                """,
-                (mid, keep_id),
-            )
+    # Losers that still exist; the merge below handles all of them at once
+    losers = [mid for mid in merge_ids if mid in details]
+    if not losers:
+        return
 
-            cur.execute(
-                "UPDATE screening SET film_id = %s WHERE film_id = %s",
-                (keep_id, mid),
-            )
+    if batch_size and any(
+        details[mid]["ref_counts"][key] > batch_size
+        for mid in losers
+        for key in ("screening_count", "stg_screening_count", "film_person_count")
+    ):
+        move_references_in_batches(conn, keep_id, losers, batch_size)
 
-            # 2) Handle stg_screening: no uniqueness on (cinema_id, film_id, start_at_utc)
-            cur.execute(
-                "UPDATE stg_screening SET film_id = %s WHERE film_id = %s",
-                (keep_id, mid),
-            )
-
-            # 3) Handle film_person
-            cur.execute(
-                """
-                INSERT INTO film_person (film_id, person_id, role)
-                SELECT %s, person_id, role
-                FROM film_person
-                WHERE film_id = %s
-                ON CONFLICT (film_id, person_id, role) DO NOTHING
-                """,
-                (keep_id, mid),
-            )
+    # p_merge_film_group (db_helper) is prepared once per pooled connection,
+    # so each group only ships its two parameters: no re-parse or re-plan
+    prepare_merge_film_group(conn)
+    with conn.cursor() as cur:
+        cur.execute("EXECUTE p_merge_film_group (%s, %s)", (keep_id, losers))
 
-            cur.execute(
-                "DELETE FROM film_person WHERE film_id = %s",
-                (mid,),
-            )
+    print(f"  {prefix}Group merged into film ID {keep_id}")
 
-            # 4) Delete the losing film row itself
-            cur.execute("DELETE FROM film WHERE id = %s", (mid,))
 
-    print(f"  {prefix}Group merged into film ID {keep_id}")
+def merge_group_on_own_connection(
+    keep_id: int,
+    merge_ids: List[int],
+    dry_run: bool,
+    details: Dict[int, Dict[str, Any]],
+    batch_size: Optional[int],
+) -> None:
+    """
+    Merge one group on a pooled connection of its own and commit it.
+    Groups of a step share no film ids, so workers never update the same
+    rows; on error the group is rolled back when the connection is returned.
+    """
+    conn = conn_open()
+    try:
+        merge_film_group(conn, keep_id, merge_ids, dry_run, details, batch_size)
+        if not dry_run:
+            conn.commit()
+    finally:
+        conn_close(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -410,7 +562,30 @@ def merge_film_group(conn, keep_id: int, merge_ids: List[int], dry_run: bool = F
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    dry_run = "--dry-run" in sys.argv
+    ap = argparse.ArgumentParser(
+        description="Merge duplicate film records (PostgreSQL)"
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Preview changes without applying them to the database.",
+    )
+    ap.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Max references moved per statement for large groups "
+             f"(default {DEFAULT_BATCH_SIZE}; 0 disables batching).",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Groups merged concurrently, each on its own connection and "
+             f"committed on its own (default {DEFAULT_WORKERS}).",
+    )
+    args = ap.parse_args()
+    dry_run = args.dry_run
     if dry_run:
         print("=" * 60)
         print("DRY RUN MODE - No changes will be made to the database")
@@ -419,50 +594,78 @@ def main() -> None:
 
     conn = conn_open()
     try:
+        # One snapshot for the whole run: the details and counts loaded up
+        # front stay consistent with what the finders see. Only this
+        # transaction is affected, not the pooled connection.
+        with conn.cursor() as cur:
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+
         total_merged = 0
         # Track IDs that have already been processed as part of a group
         # so we do not re-merge them across steps (imdb_id → tmdb_id).
-        seen_ids = set()
-
-        # Step 1: merge by imdb_id
-        print("=" * 60)
-        print("Step 1: Finding duplicate films by imdb_id...")
-        print("=" * 60)
-        imdb_dupes = find_film_duplicates_by_field(conn, "imdb_id")
-        print(f"Found {len(imdb_dupes)} duplicate groups by imdb_id")
-
-        for imdb_val, ids in imdb_dupes:
-            remaining_ids = [fid for fid in ids if fid not in seen_ids]
-            if len(remaining_ids) <= 1:
-                continue
-
-            keep = choose_best_film_record(conn, remaining_ids)
-            merge_ids = [x for x in remaining_ids if x != keep]
-            merge_film_group(conn, keep, merge_ids, dry_run)
-            total_merged += len(merge_ids)
-
-            for fid in remaining_ids:
-                seen_ids.add(fid)
-
-        # Step 2: merge by tmdb_id
-        print("\n" + "=" * 60)
-        print("Step 2: Finding duplicate films by tmdb_id...")
-        print("=" * 60)
-        tmdb_dupes = find_film_duplicates_by_field(conn, "tmdb_id")
-        print(f"Found {len(tmdb_dupes)} duplicate groups by tmdb_id")
-
-        for tmdb_val, ids in tmdb_dupes:
-            remaining_ids = [fid for fid in ids if fid not in seen_ids]
-            if len(remaining_ids) <= 1:
-                continue
-
-            keep = choose_best_film_record(conn, remaining_ids)
-            merge_ids = [x for x in remaining_ids if x != keep]
-            merge_film_group(conn, keep, merge_ids, dry_run)
-            total_merged += len(merge_ids)
+        create_merged_film_table(conn)
+
+        # Details + reference counts of every film in any group, one query
+        candidates = load_duplicate_candidates(conn)
+
+        # Groups are merged by worker threads, each on its own pooled
+        # connection with a commit per group; this connection only reads
+        # (and records processed ids in _merged_film), and keeps its pool
+        # slot, so workers share the rest. A dry run only logs, so its
+        # groups run inline here and the preview is not interleaved.
+        if not dry_run and DB_POOL_MAX < 2:
+            raise RuntimeError(
+                "merge_duplicate_films needs DB_POOL_MAX >= 2 (one connection "
+                "for reading groups, one or more for workers)")
+        workers = max(1, min(args.workers, DB_POOL_MAX - 1))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            in_flight = set()
+
+            def submit(ids: List[int]) -> int:
+                nonlocal in_flight
+                keep = choose_best_film_record(conn, ids, candidates)
+                merge_ids = [x for x in ids if x != keep]
+                if dry_run:
+                    merge_film_group(conn, keep, merge_ids, dry_run, candidates)
+                    return len(merge_ids)
+
+                in_flight.add(ex.submit(
+                    merge_group_on_own_connection,
+                    keep, merge_ids, dry_run, candidates, args.batch_size))
+                # At most 2*workers groups queued; result() re-raises a
+                # failed group's error
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        fut.result()
+                return len(merge_ids)
+
+            # Step 1: merge by imdb_id
+            print("=" * 60)
+            print("Step 1: Finding duplicate films by imdb_id...")
+            print("=" * 60)
+            imdb_groups = 0
+            for imdb_val, ids in find_film_duplicates_by_field(conn, "imdb_id"):
+                imdb_groups += 1
+                total_merged += submit(ids)
+                record_merged_films(conn, ids)
+            print(f"Found {imdb_groups} duplicate groups by imdb_id")
+
+            # Step 2: merge by tmdb_id (step 1 groups are skipped in SQL,
+            # so these never overlap with groups still being merged)
+            print("\n" + "=" * 60)
+            print("Step 2: Finding duplicate films by tmdb_id...")
+            print("=" * 60)
+            tmdb_groups = 0
+            for tmdb_val, ids in find_film_duplicates_by_field(
+                    conn, "tmdb_id", skip_merged=True):
+                tmdb_groups += 1
+                total_merged += submit(ids)
+            print(f"Found {tmdb_groups} duplicate groups by tmdb_id")
 
-            for fid in remaining_ids:
-                seen_ids.add(fid)
+            # Re-raise the first failed group, if any
+            for fut in in_flight:
+                fut.result()
 
         if dry_run:
             print("\n" + "=" * 60)
@@ -483,7 +686,7 @@ def main() -> None:
         traceback.print_exc()
         sys.exit(1)
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
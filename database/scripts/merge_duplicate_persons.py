@@ -3,10 +3,13 @@
 Merge duplicate person records in the database (PostgreSQL version).
 
 Strategy:
-1) Find duplicate groups by imdb_id, then tmdb_id, then normalized_name
-2) Pick a single record to keep (more external IDs > more refs > earlier created_at > smaller id)
-3) Repoint film_person rows to the kept record, dedup on conflict
-4) Delete merged-away person rows
+1) Find duplicate groups in one pass: persons sharing an imdb_id, tmdb_id
+   or normalized_name are linked, and each connected set is one group
+2) Pick a single record to keep, ranked in SQL by find_duplicate_groups
+   (more external IDs > more refs > earlier created_at > smaller id)
+3) In one statement per group: repoint film_person rows to the kept
+   record (dedup on conflict), fill in its missing external IDs from the
+   group, and delete the merged-away person rows
 
 Usage:
     python scripts/merge_duplicate_persons.py [--dry-run]
@@ -14,16 +17,12 @@ Usage:
 
 # NOTE: Known limitations / future improvements for merge_duplicate_persons
 #
-# 1) Same group processed multiple times
-#    The same logical person can appear as a duplicate group in:
-#      - Step 1: imdb_id
-#      - Step 2: tmdb_id
-#      - Step 3: normalized_name
-#    We currently do not track which IDs have already been merged, so some
-#    records may be revisited in later steps. This is mostly harmless because
-#    inserts use ON CONFLICT DO NOTHING, but it can generate redundant work
-#    and noisy logs. A future improvement would be to keep a "seen/merged"
-#    set and skip IDs that were already consolidated.
+# 1) Transitive groups
+#    Groups are the connected sets of the "same imdb_id / tmdb_id /
+#    normalized_name" relation, so A~B by imdb_id and B~C by name merge
+#    A, B and C together even if A and C share nothing directly. This is
+#    what we want for real duplicates, but one bad external ID can pull
+#    two different people into the same group.
 #
 # 2) Limited field reconciliation
 #    When merging, we only reconcile external IDs (imdb_id, tmdb_id), and we
@@ -40,120 +39,138 @@ Usage:
 #    (or generate them from schema metadata) to reduce this risk.
 #
 # 4) Performance considerations
-#    For large datasets, repeatedly querying per-person (details + ref counts)
-#    and re-processing the same logical groups across multiple steps may be
-#    slow. If needed, we could:
-#      - batch queries to reduce round-trips, and/or
-#      - collapse the three passes (imdb_id, tmdb_id, normalized_name) into
-#        a single dedup pass with a unified grouping / scoring strategy.
+#    The grouping query self-joins person once per key and walks each
+#    connected set recursively; its cost grows with the square of a
+#    group's size, which is fine for the small groups seen in practice.
 
 import sys
-from typing import List, Tuple, Dict, Any
-from db_helper import conn_open
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Dict, Any
+from db_helper import conn_close, conn_open
 
+# Duplicate groups whose details are loaded together in one query; the
+# merges are committed after each chunk
+DETAILS_CHUNK = 1000
 
-def find_duplicates_by_field(conn, field: str) -> List[Tuple[Any, List[int]]]:
-    """
-    Return a list of (field_value, [person_ids]) where field_value is duplicated.
-    field must be one of: 'imdb_id' (text), 'tmdb_id' (int), 'normalized_name' (text)
-    """
 
-    if field not in {"imdb_id", "tmdb_id", "normalized_name"}:
-        raise ValueError(f"Unsupported field: {field}")
+def find_duplicate_groups(conn, itersize: int = 1000) -> Iterator[Tuple[int, List[int]]]:
+    """
+    Yield (group_id, [person_ids]) for every set of persons
+    linked by a shared imdb_id, tmdb_id or normalized_name (directly or
+    through other members), each logical person exactly once. group_id is
+    the smallest id in the group.
 
-    # Build Postgres-safe non-empty predicate per type
-    if field == "tmdb_id":
-        # INT: no '' comparisons
-        where_nonempty = f"{field} IS NOT NULL"
-    else:
-        # TEXT: exclude empty strings too
-        where_nonempty = f"{field} IS NOT NULL AND {field} <> ''"
+    The ids of each group come back best-first, so ids[0] is the record to
+    keep. Score, computed in the query:
+      1) More external IDs (imdb_id, tmdb_id) is better
+      2) More film_person refs is better
+      3) Earlier created_at is better (missing created_at last)
+      4) Smaller id is better
 
-    sql = f"""
-        SELECT {field},
-               array_agg(id ORDER BY id) AS ids,
+    Groups are streamed from a server-side cursor, `itersize` at a time.
+    It is declared WITH HOLD so the caller can commit while iterating.
+    """
+    sql = """
+        WITH RECURSIVE edges AS (
+            SELECT a.id AS x, b.id AS y
+            FROM person a
+            JOIN person b ON b.imdb_id = a.imdb_id AND b.id <> a.id
+            WHERE a.imdb_id <> ''
+            UNION
+            SELECT a.id, b.id
+            FROM person a
+            JOIN person b ON b.tmdb_id = a.tmdb_id AND b.id <> a.id
+            UNION
+            SELECT a.id, b.id
+            FROM person a
+            JOIN person b ON b.normalized_name = a.normalized_name AND b.id <> a.id
+            WHERE a.normalized_name <> ''
+        ),
+        reach (id, root) AS (
+            SELECT DISTINCT x, x FROM edges
+            UNION
+            SELECT e.y, r.root
+            FROM reach r
+            JOIN edges e ON e.x = r.id
+        ),
+        grp AS (
+            SELECT id, MIN(root) AS group_id
+            FROM reach
+            GROUP BY id
+        )
+        SELECT g.group_id,
+               array_agg(p.id ORDER BY
+                   (p.imdb_id IS NOT NULL AND p.imdb_id <> '')::int
+                     + (p.tmdb_id IS NOT NULL)::int DESC,
+                   r.ref_count DESC,
+                   p.created_at ASC NULLS LAST,
+                   p.id ASC) AS ids,
                COUNT(*) AS cnt
-        FROM person
-        WHERE {where_nonempty}
-        GROUP BY {field}
-        HAVING COUNT(*) > 1
-        ORDER BY cnt DESC
+        FROM grp g
+        JOIN person p ON p.id = g.id
+        CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS ref_count
+            FROM film_person fp
+            WHERE fp.person_id = p.id
+        ) r
+        GROUP BY g.group_id
+        ORDER BY cnt DESC, g.group_id
     """
 
-    with conn.cursor() as cur:
+    with conn.cursor(name="person_dupes", withhold=True) as cur:
+        cur.itersize = itersize
         cur.execute(sql)
-        rows = cur.fetchall()
+        for group_id, ids_array, cnt in cur:
+            yield group_id, [int(x) for x in ids_array]
 
-    out: List[Tuple[Any, List[int]]] = []
-    for field_value, ids_array, cnt in rows:
-        out.append((field_value, [int(x) for x in ids_array]))
-    return out
 
+def get_persons_with_counts(conn, person_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Details plus film_person reference count ("ref_count") for many persons
+    in one query, for merge logging. Returns {person_id: details}; missing
+    ids are absent.
+    """
+    if not person_ids:
+        return {}
 
-def get_person_details(conn, person_id: int) -> Dict[str, Any]:
     with conn.cursor() as cur:
         cur.execute(
             """
-            SELECT id, name, imdb_id, tmdb_id, normalized_name, created_at
-            FROM person
-            WHERE id = %s
+            SELECT p.id, p.name, p.imdb_id, p.tmdb_id, p.normalized_name,
+                   p.created_at, COUNT(fp.person_id)
+            FROM person p
+            LEFT JOIN film_person fp ON fp.person_id = p.id
+            WHERE p.id = ANY(%s)
+            GROUP BY p.id
             """,
-            (person_id,),
+            (list(person_ids),),
         )
-        row = cur.fetchone()
-
-    if not row:
-        return {}
+        rows = cur.fetchall()
 
     return {
-        "id": row[0],
-        "name": row[1],
-        "imdb_id": row[2],
-        "tmdb_id": row[3],
-        "normalized_name": row[4],
-        "created_at": row[5],
+        row[0]: {
+            "id": row[0],
+            "name": row[1],
+            "imdb_id": row[2],
+            "tmdb_id": row[3],
+            "normalized_name": row[4],
+            "created_at": row[5],
+            "ref_count": row[6],
+        }
+        for row in rows
     }
 
 
-def count_film_references(conn, person_id: int) -> int:
-    with conn.cursor() as cur:
-        cur.execute(
-            "SELECT COUNT(*) FROM film_person WHERE person_id = %s", (person_id,))
-        return cur.fetchone()[0]
-
-
-def choose_best_record(conn, person_ids: List[int]) -> int:
-    """
-    Score:
-      1) More external IDs (imdb_id, tmdb_id) is better
-      2) More film_person refs is better
-      3) Earlier created_at is better
-      4) Smaller id is better
-    """
-    records = []
-    for pid in person_ids:
-        details = get_person_details(conn, pid)
-        details["ref_count"] = count_film_references(conn, pid)
-        records.append(details)
-
-    def score(rec):
-        id_count = int(bool(rec.get("imdb_id"))) + \
-            int(bool(rec.get("tmdb_id")))
-        # earlier created_at should sort higher ⇒ use negative timestamp
-        ts = rec["created_at"].timestamp() if rec.get(
-            "created_at") else float("inf")
-        return (
-            id_count,               # higher is better
-            rec["ref_count"],       # higher is better
-            -ts,                    # earlier is better
-            -rec["id"],             # smaller id is better
-        )
-
-    return sorted(records, key=score, reverse=True)[0]["id"]
-
-
-def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = False):
-    keep_details = get_person_details(conn, keep_id)
+def merge_persons(
+    conn,
+    keep_id: int,
+    merge_ids: List[int],
+    dry_run: bool = False,
+    details: Optional[Dict[int, Dict[str, Any]]] = None,
+):
+    if details is None:
+        details = get_persons_with_counts(conn, [keep_id] + merge_ids)
+    keep_details = details.get(keep_id, {})
 
     prefix = "[DRY RUN] " if dry_run else ""
     print(f"\n{prefix}Merging into: {keep_details.get('name')} (ID: {keep_id})")
@@ -164,68 +181,76 @@ def merge_persons(conn, keep_id: int, merge_ids: List[int], dry_run: bool = Fals
     total_refs = 0
 
     for mid in merge_ids:
-        merge_details = get_person_details(conn, mid)
-        ref_count = count_film_references(conn, mid)
+        merge_details = details.get(mid, {})
+        ref_count = merge_details.get("ref_count", 0)
         total_refs += ref_count
 
         print(
             f"  {prefix}Merging: {merge_details.get('name')} (ID: {mid}) - {ref_count} film references")
 
-        if dry_run:
-            continue
-
+    row = None  # kept person's (imdb_id, tmdb_id) after the merge
+    if not dry_run and merge_ids:
+        # All merged-away persons at once, in one statement. Every part
+        # sees the same snapshot and touches its own rows:
+        #   1) copy references to the kept person; dedup on PK (film_id, person_id, role)
+        #   2) delete old film_person rows for merged-away persons
+        #   3) enhance the kept record with the best external IDs across
+        #      the group, filling only the ones it lacks (the merged-away
+        #      rows are still visible here); skipped, with no row
+        #      rewritten, when it already has both
+        #   4) delete the duplicate person rows themselves; FK checks run
+        #      at statement end, after their film_person rows are gone
         with conn.cursor() as cur:
-            # Copy references to kept person; dedup on PK/unique (film_id, person_id, role)
             cur.execute(
                 """
-                INSERT INTO film_person (film_id, person_id, role)
-                SELECT film_id, %s, role
-                FROM film_person
-                WHERE person_id = %s
-                ON CONFLICT (film_id, person_id, role) DO NOTHING
+                WITH ins_fp AS (
+                    INSERT INTO film_person (film_id, person_id, role)
+                    SELECT film_id, %(keep)s, role
+                    FROM film_person
+                    WHERE person_id = ANY(%(merge)s)
+                    ON CONFLICT (film_id, person_id, role) DO NOTHING
+                ),
+                del_fp AS (
+                    DELETE FROM film_person
+                    WHERE person_id = ANY(%(merge)s)
+                ),
+                enhanced AS (
+                    UPDATE person
+                    SET imdb_id = COALESCE(
+                            NULLIF(imdb_id, ''),
+                            (SELECT MAX(imdb_id) FROM person
+                             WHERE id = ANY(%(merge)s) AND imdb_id <> '')),
+                        tmdb_id = COALESCE(
+                            tmdb_id,
+                            (SELECT MAX(tmdb_id) FROM person
+                             WHERE id = ANY(%(merge)s)))
+                    WHERE id = %(keep)s
+                      -- nothing to fill when the kept record has both IDs
+                      AND (imdb_id IS NULL OR imdb_id = '' OR tmdb_id IS NULL)
+                    RETURNING imdb_id, tmdb_id
+                ),
+                del_person AS (
+                    DELETE FROM person
+                    WHERE id = ANY(%(merge)s)
+                )
+                SELECT imdb_id, tmdb_id FROM enhanced
                 """,
-                (keep_id, mid),
+                {"keep": keep_id, "merge": merge_ids},
             )
-
-            # Delete old film_person rows for merged-away person
-            cur.execute("DELETE FROM film_person WHERE person_id = %s", (mid,))
-
-            # Delete the duplicate person row itself
-            cur.execute("DELETE FROM person WHERE id = %s", (mid,))
+            row = cur.fetchone()
 
     print(f"  {prefix}Total references to merge: {total_refs}")
 
-    # Enhance kept record with best external IDs across the group
-    if not dry_run and merge_ids:
-        all_ids = [keep_id] + merge_ids
-        placeholders = ",".join(["%s"] * len(all_ids))
-
-        with conn.cursor() as cur:
-            cur.execute(
-                f"""
-                SELECT
-                    MAX(CASE WHEN imdb_id IS NOT NULL AND imdb_id <> '' THEN imdb_id END) AS best_imdb,
-                    MAX(CASE WHEN tmdb_id IS NOT NULL THEN tmdb_id END) AS best_tmdb
-                FROM person
-                WHERE id IN ({placeholders})
-                """,
-                all_ids,
-            )
-            best_imdb, best_tmdb = cur.fetchone()
+    if row:
+        best_imdb, best_tmdb = row
+        updates = []
+        if best_imdb and not keep_details.get("imdb_id"):
+            updates.append(f"IMDB: {best_imdb}")
+        if best_tmdb and not keep_details.get("tmdb_id"):
+            updates.append(f"TMDB: {best_tmdb}")
 
-            updates = []
-            if best_imdb and not keep_details.get("imdb_id"):
-                cur.execute(
-                    "UPDATE person SET imdb_id = %s WHERE id = %s", (best_imdb, keep_id))
-                updates.append(f"IMDB: {best_imdb}")
-
-            if best_tmdb and not keep_details.get("tmdb_id"):
-                cur.execute(
-                    "UPDATE person SET tmdb_id = %s WHERE id = %s", (best_tmdb, keep_id))
-                updates.append(f"TMDB: {best_tmdb}")
-
-            if updates:
-                print(f"  Enhanced kept record with: {', '.join(updates)}")
+        if updates:
+            print(f"  Enhanced kept record with: {', '.join(updates)}")
 
 
 def main():
@@ -239,42 +264,39 @@ def main():
     conn = conn_open()
     try:
         total_merged = 0
+        failed_groups = 0
 
-        # 1) by imdb_id
-        print("=" * 60)
-        print("Step 1: Finding duplicates by imdb_id...")
         print("=" * 60)
-        imdb_dupes = find_duplicates_by_field(conn, "imdb_id")
-        print(f"Found {len(imdb_dupes)} groups")
-        for imdb, ids in imdb_dupes:
-            keep = choose_best_record(conn, ids)
-            merge_ids = [x for x in ids if x != keep]
-            merge_persons(conn, keep, merge_ids, dry_run)
-            total_merged += len(merge_ids)
-
-        # 2) by tmdb_id
-        print("\n" + "=" * 60)
-        print("Step 2: Finding duplicates by tmdb_id...")
+        print("Finding duplicate groups (imdb_id / tmdb_id / normalized_name)...")
         print("=" * 60)
-        tmdb_dupes = find_duplicates_by_field(conn, "tmdb_id")
-        print(f"Found {len(tmdb_dupes)} groups")
-        for tmdb, ids in tmdb_dupes:
-            keep = choose_best_record(conn, ids)
-            merge_ids = [x for x in ids if x != keep]
-            merge_persons(conn, keep, merge_ids, dry_run)
-            total_merged += len(merge_ids)
-
-        # 3) by normalized_name
-        print("\n" + "=" * 60)
-        print("Step 3: Finding duplicates by normalized_name...")
-        print("=" * 60)
-        name_dupes = find_duplicates_by_field(conn, "normalized_name")
-        print(f"Found {len(name_dupes)} groups")
-        for normname, ids in name_dupes:
-            keep = choose_best_record(conn, ids)
-            merge_ids = [x for x in ids if x != keep]
-            merge_persons(conn, keep, merge_ids, dry_run)
-            total_merged += len(merge_ids)
+        total_groups = 0
+        groups = find_duplicate_groups(conn)
+        # Groups arrive in chunks; details for a whole chunk come in one
+        # query. Groups share no ids, so counts loaded ahead of a chunk
+        # stay accurate while its merges run.
+        while chunk := list(islice(groups, DETAILS_CHUNK)):
+            total_groups += len(chunk)
+            details = get_persons_with_counts(
+                conn, [pid for _, ids in chunk for pid in ids])
+            for group_id, ids in chunk:
+                keep, merge_ids = ids[0], ids[1:]  # best-first from the query
+                # A failing group is rolled back on its own and skipped
+                with conn.cursor() as cur:
+                    cur.execute("SAVEPOINT merge_group")
+                    try:
+                        merge_persons(conn, keep, merge_ids, dry_run, details)
+                    except Exception as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT merge_group")
+                        failed_groups += 1
+                        print(
+                            f"\n❌ Group {ids} failed and was skipped: {e}",
+                            file=sys.stderr)
+                        continue
+                    cur.execute("RELEASE SAVEPOINT merge_group")
+                total_merged += len(merge_ids)
+            if not dry_run:
+                conn.commit()
+        print(f"Found {total_groups} groups")
 
         if dry_run:
             print("\n" + "=" * 60)
@@ -288,6 +310,11 @@ def main():
             print(f"✅ SUCCESS: Merged {total_merged} duplicate person records")
             print("=" * 60)
 
+        if failed_groups:
+            print(f"❌ {failed_groups} group(s) failed; see errors above",
+                  file=sys.stderr)
+            sys.exit(1)
+
     except Exception as e:
         conn.rollback()
         print(f"\n❌ ERROR: {e}", file=sys.stderr)
@@ -295,7 +322,7 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
@@ -36,7 +36,8 @@ IMPORTANT:
       * stg_screening.film_id
       * film_person.film_id
     If you add new foreign-key relationships to film.id in the future,
-    they MUST be handled here to avoid leaving broken references.
+    they MUST be handled in the p_merge_film_group statement (db_helper.py,
+    shared with merge_duplicate_films.py) to avoid leaving broken references.
 
   - For screening:
       * There is a UNIQUE constraint on (cinema_id, film_id, start_at_utc).
@@ -48,7 +49,8 @@ IMPORTANT:
 
 import sys
 from typing import List, Tuple, Dict, Any
-from db_helper import conn_open
+from psycopg2.extras import execute_batch
+from db_helper import conn_close, conn_open, prepare_merge_film_group
 
 # ---------------------------------------------------------------------------
 # EDIT THIS LIST FOR YOUR MANUAL MERGES
@@ -67,9 +69,10 @@ MANUAL_MERGES: List[Tuple[int, List[int]]] = [
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def get_film_details(conn, film_id: int) -> Dict[str, Any]:
+def get_film_details(conn, film_ids: List[int]) -> Dict[int, Dict[str, Any]]:
     """
-    Fetch basic details for a film. If not found, returns {}.
+    Fetch basic details for many films in one query.
+    Returns {film_id: details}; ids not found are absent.
     """
     with conn.cursor() as cur:
         cur.execute(
@@ -82,98 +85,96 @@ def get_film_details(conn, film_id: int) -> Dict[str, Any]:
                    imdb_url,
                    created_at
             FROM film
-            WHERE id = %s
+            WHERE id = ANY(%s)
             """,
-            (film_id,),
+            (list(film_ids),),
         )
-        row = cur.fetchone()
-
-    if not row:
-        return {}
+        rows = cur.fetchall()
 
     return {
-        "id": row[0],
-        "title": row[1],
-        "year": row[2],
-        "imdb_id": row[3],
-        "tmdb_id": row[4],
-        "imdb_url": row[5],
-        "created_at": row[6],
+        row[0]: {
+            "id": row[0],
+            "title": row[1],
+            "year": row[2],
+            "imdb_id": row[3],
+            "tmdb_id": row[4],
+            "imdb_url": row[5],
+            "created_at": row[6],
+        }
+        for row in rows
     }
 
 
-def count_film_references(conn, film_id: int) -> Dict[str, int]:
+def count_film_references(conn, film_ids: List[int]) -> Dict[int, Dict[str, int]]:
     """
-    Count how many references a film has across key tables.
+    Count how many references each film has across key tables, for all of
+    film_ids in one query.
 
     Returns:
       {
-        "screening_count": int,
-        "stg_screening_count": int,
-        "film_person_count": int,
-        "total": int,
+        film_id: {
+          "screening_count": int,
+          "stg_screening_count": int,
+          "film_person_count": int,
+          "total": int,
+        },
       }
     """
     with conn.cursor() as cur:
         cur.execute(
-            "SELECT COUNT(*) FROM screening WHERE film_id = %s",
-            (film_id,),
-        )
-        screening_count = cur.fetchone()[0]
-
-        cur.execute(
-            "SELECT COUNT(*) FROM stg_screening WHERE film_id = %s",
-            (film_id,),
-        )
-        stg_count = cur.fetchone()[0]
-
-        cur.execute(
-            "SELECT COUNT(*) FROM film_person WHERE film_id = %s",
-            (film_id,),
+            """
+            SELECT f.id,
+                   (SELECT COUNT(*) FROM screening WHERE film_id = f.id),
+                   (SELECT COUNT(*) FROM stg_screening WHERE film_id = f.id),
+                   (SELECT COUNT(*) FROM film_person WHERE film_id = f.id)
+            FROM unnest(%s::int[]) AS f(id)
+            """,
+            (list(film_ids),),
         )
-        fp_count = cur.fetchone()[0]
+        rows = cur.fetchall()
 
-    total = screening_count + stg_count + fp_count
     return {
-        "screening_count": screening_count,
-        "stg_screening_count": stg_count,
-        "film_person_count": fp_count,
-        "total": total,
+        film_id: {
+            "screening_count": screening_count,
+            "stg_screening_count": stg_count,
+            "film_person_count": fp_count,
+            "total": screening_count + stg_count + fp_count,
+        }
+        for film_id, screening_count, stg_count, fp_count in rows
     }
 
 
 # ---------------------------------------------------------------------------
-# Core merge logic for one manual group
+# Core merge logic
 # ---------------------------------------------------------------------------
 
-def merge_film_group_manual(
+def preview_film_group_manual(
     conn,
     keep_id: int,
     merge_ids: List[int],
     dry_run: bool = False,
-) -> None:
+) -> List[int]:
     """
-    Merge a group of films into a single kept film (keep_id), using
-    manually specified losing IDs.
+    Log what merging a group of films into a single kept film (keep_id)
+    will do, using manually specified losing IDs.
 
     Steps:
       1) Log summary of what will be merged.
-      2) For each losing film_id in merge_ids:
-           - log details and reference counts
-           - if not dry-run:
-               * move screening references, deduplicating conflicts
-               * move stg_screening references
-               * move film_person references (ON CONFLICT DO NOTHING)
-               * delete the losing film row
+      2) Log details and reference counts for each losing film_id.
+
+    Returns the losing ids that exist (empty if keep_id does not); the
+    merge itself is done by apply_manual_merges for all groups at once.
     """
     if not merge_ids:
-        return
+        return []
 
-    keep_details = get_film_details(conn, keep_id)
+    # Details of the whole group, fetched once and reused below
+    details_map = get_film_details(conn, [keep_id] + merge_ids)
+    keep_details = details_map.get(keep_id)
     if not keep_details:
         prefix = "[DRY RUN] " if dry_run else ""
         print(f"{prefix}WARNING: keep_id={keep_id} not found; skipping group.")
-        return
+        return []
 
     prefix = "[DRY RUN] " if dry_run else ""
     print(
@@ -183,14 +184,19 @@ def merge_film_group_manual(
     print(f"  IMDB URL: {keep_details.get('imdb_url') or 'None'}")
 
     total_refs = 0
+    # Reference counts of every loser, in one query
+    counts = count_film_references(conn, merge_ids)
+    # Losers found in details_map; the merge only touches these
+    alive: List[int] = []
 
     for mid in merge_ids:
-        merge_details = get_film_details(conn, mid)
+        merge_details = details_map.get(mid)
         if not merge_details:
             print(f"  {prefix}Film ID {mid} not found; skipping.")
             continue
+        alive.append(mid)
 
-        ref_counts = count_film_references(conn, mid)
+        ref_counts = counts[mid]
         total_refs += ref_counts["total"]
 
         print(
@@ -201,62 +207,27 @@ def merge_film_group_manual(
         )
 
     print(f"  {prefix}Total references to move from losing films: {total_refs}")
+    return alive
 
-    if dry_run:
-        return
 
+def apply_manual_merges(conn, merges: List[Tuple[int, List[int]]]) -> None:
+    """
+    Merge every (keep_id, losing_ids) group, in order, with the
+    p_merge_film_group prepared statement (db_helper) that
+    merge_duplicate_films also uses. For each group's losers it:
+      * moves screening references, deduplicating conflicts
+      * moves stg_screening references
+      * moves film_person references (ON CONFLICT DO NOTHING)
+      * deletes the losing film rows
+    All groups are sent in pages of 100 statements per round-trip.
+    """
+    prepare_merge_film_group(conn)
     with conn.cursor() as cur:
-        for mid in merge_ids:
-            merge_details = get_film_details(conn, mid)
-            if not merge_details:
-                # Already deleted or never existed
-                continue
+        execute_batch(
+            cur, "EXECUTE p_merge_film_group (%s, %s)", merges, page_size=100)
 
-            # 1) Handle screening: avoid violating UNIQUE (cinema_id, film_id, start_at_utc)
-            cur.execute(
-                """
-                DELETE FROM screening s
-                USING screening k
-                WHERE s.film_id = %s
-                  AND k.film_id = %s
-                  AND s.cinema_id = k.cinema_id
-                  AND s.start_at_utc = k.start_at_utc
-                """,
-                (mid, keep_id),
-            )
-
-            cur.execute(
-                "UPDATE screening SET film_id = %s WHERE film_id = %s",
-                (keep_id, mid),
-            )
-
-            # 2) Handle stg_screening (no uniqueness to worry about here)
-            cur.execute(
-                "UPDATE stg_screening SET film_id = %s WHERE film_id = %s",
-                (keep_id, mid),
-            )
-
-            # 3) Handle film_person
-            cur.execute(
-                """
-                INSERT INTO film_person (film_id, person_id, role)
-                SELECT %s, person_id, role
-                FROM film_person
-                WHERE film_id = %s
-                ON CONFLICT (film_id, person_id, role) DO NOTHING
-                """,
-                (keep_id, mid),
-            )
-
-            cur.execute(
-                "DELETE FROM film_person WHERE film_id = %s",
-                (mid,),
-            )
-
-            # 4) Delete the losing film row itself
-            cur.execute("DELETE FROM film WHERE id = %s", (mid,))
-
-    print(f"  {prefix}Group merged into film ID {keep_id}")
+    for keep_id, _ in merges:
+        print(f"  Group merged into film ID {keep_id}")
 
 
 # ---------------------------------------------------------------------------
@@ -280,6 +251,9 @@ def main() -> None:
     try:
         total_groups = 0
         total_losers = 0
+        # Groups to merge, as (keep_id, existing losing ids)
+        pending: List[Tuple[int, List[int]]] = []
+        all_losers = {mid for _, losers in MANUAL_MERGES for mid in losers}
 
         for keep_id, losers in MANUAL_MERGES:
             if not losers:
@@ -289,11 +263,22 @@ def main() -> None:
             if keep_id in losers:
                 raise ValueError(
                     f"keep_id {keep_id} appears in its own loser list.")
+            # Every group is previewed before any is merged, so a kept
+            # film must not be deleted by another group
+            if keep_id in all_losers:
+                raise ValueError(
+                    f"keep_id {keep_id} is a loser in another group.")
 
             total_groups += 1
             total_losers += len(losers)
 
-            merge_film_group_manual(conn, keep_id, losers, dry_run)
+            alive = preview_film_group_manual(conn, keep_id, losers, dry_run)
+            if alive:
+                pending.append((keep_id, alive))
+
+        if not dry_run and pending:
+            print()
+            apply_manual_merges(conn, pending)
 
         if dry_run:
             print("\n" + "=" * 60)
@@ -317,7 +302,7 @@ def main() -> None:
         traceback.print_exc()
         sys.exit(1)
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
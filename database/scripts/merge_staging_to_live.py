@@ -28,7 +28,7 @@ Usage:
 
 import argparse
 from datetime import datetime
-from db_helper import conn_open
+from db_helper import conn_close, conn_open
 
 # ---------------------------------------------------------------------------
 # SQL statements
@@ -294,7 +294,7 @@ def run_merge(dry_run: bool) -> None:
                         f"updated={rows_updated}, deactivated={rows_deactivated}"
                     )
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -5,16 +5,19 @@ Enrich film records with OMDb metadata (PostgreSQL version).
 - Fetches OMDb data by IMDb ID when available, otherwise by title/year
 - Updates film table fields (rated, genre, language, country, awards,
   rt_rating_pct, imdb_rating, imdb_votes, description)
-- Inserts people (director/writer/cast) via upsert_person / upsert_film_person
+- Inserts people (director/writer/cast) via upsert_persons_bulk / upsert_film_persons_bulk
 
 Env:
   - OMDB_API_KEY in database/.env
   - DATABASE_URL in database/.env (used by db_helper.conn_open)
+  - OMDB_WORKERS (optional, default 8): films enriched concurrently
 """
 
 import os
 import sys
 import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -22,10 +25,13 @@ import requests
 from dotenv import load_dotenv
 
 from db_helper import (
+    DB_POOL_MAX,
+    conn_close,
     conn_open,
-    fetch_all_films,
-    upsert_person,
-    upsert_film_person,
+    iter_all_films,
+    normalize_person_name,
+    upsert_persons_bulk,
+    upsert_film_persons_bulk,
 )
 
 # ---------- Environment ----------
@@ -47,8 +53,20 @@ if not OMDB_API_KEY:
 
 OMDB_URL = "https://www.omdbapi.com/"
 
-HTTP = requests.Session()
-HTTP.headers.update({"Accept": "application/json"})
+# Films enriched concurrently (capped by the DB pool size)
+OMDB_WORKERS = int(os.getenv("OMDB_WORKERS", "8"))
+
+# requests.Session is not thread-safe, so each worker thread gets its own
+_http_local = threading.local()
+
+
+def _http() -> requests.Session:
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"Accept": "application/json"})
+        _http_local.session = session
+    return session
 
 
 # ---------- OMDb helpers ----------
@@ -65,7 +83,7 @@ def fetch_omdb_data(film: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             params["y"] = film["year"]
 
     try:
-        resp = HTTP.get(OMDB_URL, params=params, timeout=15)
+        resp = _http().get(OMDB_URL, params=params, timeout=15)
         if resp.status_code == 200:
             return resp.json()
         print(
@@ -145,53 +163,96 @@ def update_film_omdb_fields(conn, film_id: int, omdb_data: Dict[str, Any]) -> No
 
 
 # ---------- Main ----------
+def enrich_film(film: Dict[str, Any]) -> bool:
+    """
+    Fetch and store OMDb data for one film on its own pooled connection.
+    Returns True if OMDb had a match.
+    """
+    omdb_data = fetch_omdb_data(film)
+    if not omdb_data or omdb_data.get("Response") == "False":
+        print(
+            f"[MISS] {film['title']} ({film.get('year') or ''})  imdb_id={film.get('imdb_id') or '-'}")
+        return False
+
+    conn = conn_open()
+    try:
+        update_film_omdb_fields(conn, film["id"], omdb_data)
+
+        # people: Director / Writer / Actors
+        credits = []
+        for role in ["Director", "Writer", "Actors"]:
+            names = (omdb_data.get(role) or "").split(",")
+            for name in (n.strip() for n in names):
+                if not name:
+                    continue
+                credits.append(
+                    (name, role.lower() if role != "Actors" else "cast"))
+
+        # one round-trip for all of this film's people
+        person_ids = upsert_persons_bulk(
+            conn, [{"name": name} for name, _ in credits])
+        upsert_film_persons_bulk(
+            conn,
+            [
+                (film["id"], person_ids[normalize_person_name(name)], role)
+                for name, role in credits
+            ],
+        )
+        conn.commit()
+    finally:
+        conn_close(conn)
+
+    # brief success log with key fields
+    rt = parse_rt_percent(omdb_data)
+    ir = parse_imdb_rating(omdb_data)
+    iv = parse_imdb_votes(omdb_data)
+    print(
+        f"[OK] {film['title']} ({film.get('year') or ''})  "
+        f"imdb_id={film.get('imdb_id') or omdb_data.get('imdbID') or '-'}  "
+        f"Rated={omdb_data.get('Rated') or '-'}  RT%={rt if rt is not None else '-'}  "
+        f"IMDb={ir if ir is not None else '-'} ({iv if iv is not None else '-'})"
+    )
+    return True
+
+
 def main():
+    # The film stream below keeps one pool slot for the whole run; workers
+    # share the rest, so at least one must be left for them
+    if DB_POOL_MAX < 2:
+        print("Error: omdb_api needs DB_POOL_MAX >= 2 (one connection for "
+              "the film stream, one or more for workers)", file=sys.stderr)
+        sys.exit(1)
+    workers = max(1, min(OMDB_WORKERS, DB_POOL_MAX - 1))
+    found = not_found = 0
+
     conn = conn_open()
     try:
-        # returns list of dicts (id, title, year, imdb_id, tmdb_id)
-        films = fetch_all_films(conn)
-        found, not_found = 0, 0
-
-        for film in films:
-            omdb_data = fetch_omdb_data(film)
-            if not omdb_data or omdb_data.get("Response") == "False":
-                print(
-                    f"[MISS] {film['title']} ({film.get('year') or ''})  imdb_id={film.get('imdb_id') or '-'}")
-                not_found += 1
-                continue
-
-            update_film_omdb_fields(conn, film["id"], omdb_data)
-            found += 1
-
-            # brief success log with key fields
-            rt = parse_rt_percent(omdb_data)
-            ir = parse_imdb_rating(omdb_data)
-            iv = parse_imdb_votes(omdb_data)
-            print(
-                f"[OK] {film['title']} ({film.get('year') or ''})  "
-                f"imdb_id={film.get('imdb_id') or omdb_data.get('imdbID') or '-'}  "
-                f"Rated={omdb_data.get('Rated') or '-'}  RT%={rt if rt is not None else '-'}  "
-                f"IMDb={ir if ir is not None else '-'} ({iv if iv is not None else '-'})"
-            )
-
-            # people: Director / Writer / Actors
-            for role in ["Director", "Writer", "Actors"]:
-                names = (omdb_data.get(role) or "").split(",")
-                for name in (n.strip() for n in names):
-                    if not name:
-                        continue
-                    person_id = upsert_person(conn, name)
-                    upsert_film_person(
-                        conn,
-                        film["id"],
-                        person_id,
-                        role.lower() if role != "Actors" else "cast",
-                    )
+        # Each worker borrows its own pooled connection (waiting if the
+        # pool is busy) and commits per film. Films are submitted in a
+        # window of 2*workers, refilled from the cursor as results come in,
+        # so the cursor streams instead of being drained up front
+        # (Executor.map would submit every film at once).
+        films = iter_all_films(conn)  # dicts (id, title, year, imdb_id, tmdb_id)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            in_flight = set()
+            for film in films:
+                in_flight.add(ex.submit(enrich_film, film))
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        if fut.result():
+                            found += 1
+                        else:
+                            not_found += 1
+            for fut in in_flight:
+                if fut.result():
+                    found += 1
+                else:
+                    not_found += 1
 
-        conn.commit()
         print(f"\nDone. OMDb updated: {found}  |  Not found: {not_found}")
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":
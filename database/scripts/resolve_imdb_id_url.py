@@ -19,7 +19,7 @@ import requests
 from dotenv import load_dotenv
 from psycopg2.extras import RealDictCursor
 
-from db_helper import conn_open, norm_title, remove_parentheses
+from db_helper import conn_close, conn_open, norm_title, remove_parentheses
 
 # ---------- Config ----------
 # Load environment variables from .env in database directory
@@ -294,7 +294,7 @@ def main():
             f"Done. Updated IDs: {updated}, Not found: {not_found}, IMDb URLs filled: {filled}")
         conn.commit()
     finally:
-        conn.close()
+        conn_close(conn)
 
 
 if __name__ == "__main__":